@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for the production prefork server.
+
+Usage (from the project root):
+    gunicorn -c gunicorn.conf.py
+
+The application (spaCy model, parsers and document templates) is imported once
+in the master process and the workers are forked from it, so they share that
+memory copy-on-write instead of each loading their own copy.
+"""
+import gc
+import itertools
+
+from src.config import Config
+from src.logging_setup import configure_logging
+
+wsgi_app = "src.api:app"
+bind = Config.SERVER_BIND
+workers = Config.SERVER_WORKERS
+threads = Config.SERVER_THREADS
+# Threaded workers: the admission control of src.api counts the requests of a worker's threads
+worker_class = "gthread"
+timeout = Config.SERVER_TIMEOUT
+
+# Load src.api in the master before forking
+preload_app = True
+
+
+def when_ready(server):
+    """Freeze the preloaded objects before the workers are forked."""
+    # Objects in the permanent generation are never scanned by the collector,
+    # so the workers do not dirty (and copy) the shared model pages.
+    gc.freeze()
+    server.log.info(f"Preloaded application, forking {workers} worker(s) x {threads} thread(s)")
+
+    # Admission control is per worker and only sees the requests its threads picked up
+    admitted = Config.PIPELINE_CONCURRENCY + Config.ADMISSION_QUEUE_SIZE
+    if threads < Config.PIPELINE_CONCURRENCY:
+        server.log.warning(f"SERVER_THREADS={threads} caps each worker at {threads} conversion(s), "
+                           f"below PIPELINE_CONCURRENCY={Config.PIPELINE_CONCURRENCY}")
+    if threads <= admitted:
+        server.log.warning(f"SERVER_THREADS={threads} <= PIPELINE_CONCURRENCY + ADMISSION_QUEUE_SIZE={admitted}: "
+                           f"requests wait in gunicorn's backlog and are never rejected with a 429")
+
+
+def pre_fork(server, worker):
+    """Give the new worker the lowest log slot not used by a live worker."""
+    used = {getattr(live_worker, "log_slot", None) for live_worker in server.WORKERS.values()}
+    worker.log_slot = next(slot for slot in itertools.count() if slot not in used)
+
+
+def post_fork(server, worker):
+    """Start the worker's log writer thread (threads do not survive fork)."""
+    # One file per worker slot: size-based rotation is not safe across processes
+    configure_logging(Config.LOG_FOLDER / f"api.worker{worker.log_slot}.log")
@@ -1,30 +1,53 @@
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, stream_with_context
 from pathlib import Path
+from typing import Optional
 import os
 import logging
 from src.main import DocumentProcessor, process_and_fill_document
 from src.config import Config
-from src.models.letter_of_credit_parser import LetterOfCreditParser
-import sys
+from src.logging_setup import configure_logging, request_id_var
+from src.artifact_store import DeltaArtifactStore
+from src.models.template_document_filler import DocumentFiller
+from src.zip_stream import stream_zip
+from src.rate_limiter import AdmissionController, AdmissionRejected
+from src.circuit_breaker import llm_circuit_breaker
+from src.profiling import profiling_requested, profile_request
+from src.single_flight import SingleFlight, process_lock
+from src.models.prompt_builder import PromptBuilder
+import hashlib
+import uuid
+from io import BytesIO
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('../logs/api.log')
-    ]
-)
+# Configure logging (queued, written by a background thread)
+configure_logging(Config.LOG_FOLDER / "api.log")
 
 logger = logging.getLogger(__name__)
 
+
+@app.before_request
+def assign_request_id():
+    """Tag the logs of the request with its id (X-Request-ID header, or a new one)."""
+    request.environ['request_id_token'] = request_id_var.set(
+        request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16])
+
+
+@app.after_request
+def return_request_id(response):
+    response.headers['X-Request-ID'] = request_id_var.get()
+    return response
+
+
+@app.teardown_request
+def clear_request_id(exception=None):
+    token = request.environ.pop('request_id_token', None)
+    if token is not None:
+        request_id_var.reset(token)
+
 # Initialize the DocumentProcessor
 processor = DocumentProcessor()
 
@@ -33,6 +56,17 @@ UPLOAD_FOLDER = Config.UPLOAD_FOLDER
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
+# Generated documents stored as deltas (ARTIFACT_STORAGE=delta)
+artifact_store = DeltaArtifactStore()
+
+# Bounded queue in front of the processing pipeline
+admission_controller = AdmissionController(Config.PIPELINE_CONCURRENCY, Config.ADMISSION_QUEUE_SIZE)
+
+# Coalesces identical /convert requests in flight
+single_flight = SingleFlight()
+
+DOCX_MIMETYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
 if not Config.OPENAI_API_KEY:
     logger.error("❌ OPENAI API Key is missing! Ensure it's set in the .env file.")
     raise ValueError("OPENAI API Key is required for extraction.")
@@ -40,6 +74,10 @@ if not Config.OPENAI_API_KEY:
 @app.route(f"{Config.UPLOAD_FOLDER}/<path:filename>")
 def serve_file(filename):
     try:
+        if not (Path(Config.UPLOAD_FOLDER) / filename).is_file() and artifact_store.exists(filename):
+            # Reassemble the document from the delta store
+            return send_file(BytesIO(artifact_store.load(filename)), mimetype=DOCX_MIMETYPE,
+                             download_name=filename)
         return send_from_directory(Config.UPLOAD_FOLDER, filename)
     except Exception as e:
         logger.error(f"Error serving file {filename}: {str(e)}")
@@ -69,12 +107,84 @@ def list_files():
                 'date': file_stats.st_mtime,
                 'path': f'{UPLOAD_FOLDER}/{filename}'
             })
+
+        # Documents stored as deltas
+        listed = {file['name'] for file in files}
+        for artifact in artifact_store.list_artifacts():
+            if artifact['name'] in listed:
+                continue
+            files.append({
+                'id': artifact['name'],
+                'name': artifact['name'],
+                'size': artifact['size'],
+                'date': artifact['date'],
+                'path': f"{UPLOAD_FOLDER}/{artifact['name']}"
+            })
         return jsonify(files)
     except Exception as e:
         logger.error(f"Error listing files: {str(e)}")
         return jsonify([])  # Return an empty list on error
 
 
+def _process_lc_upload(content: bytes, pipelined: Optional[bool] = None):
+    """Run the processing pipeline on the content of an uploaded Letter of Credit file."""
+    # Decode the upload once, in memory (no round trip through a shared file)
+    try:
+        lc_text = content.decode('utf-8')
+    except UnicodeDecodeError:
+        logger.error("Uploaded Letter of Credit is not valid UTF-8.")
+        return {"error": "Invalid file encoding. Please upload a UTF-8 .txt file."}, 400
+
+    # Parse the LC and extract BOL, verification, and required documents
+    # (pipelined with the parsing, incrementally for amended LCs)
+    context = processor.parse_and_extract(lc_text, pipelined)
+    if context is None:
+        logger.error("Failed to extract information from Letter of Credit.")
+        return {"error": "Processing failed. Unable to extract information."}, 500
+
+    extractions = context.extractions
+    lc_number = context.lc_info.get('21', {}).get('value', 'UNKNOWN')
+    output_filename = DocumentFiller.output_path_for(Config.OUTPUT_FILES['bill_of_lading'], lc_number).name
+
+    # Re-render the templates from the merged LC information
+    process_and_fill_document(context)
+
+    # Degraded mode: the documents are rendered, the missing sections are flagged
+    missing_sections = DocumentProcessor.missing_sections(extractions)
+    return {
+        "message": ("Document processed with missing sections, to be completed manually."
+                    if missing_sections else "Document processed successfully!"),
+        "document_filename": output_filename,
+        "BOL Extraction": extractions["BOL Extraction"] or "No Bill of Lading data found",
+        "Verification Points": extractions["Verification Points"] or "No verification points extracted",
+        "Required Documents": extractions["Required Documents"] or "No required documents extracted",
+        "Degraded": bool(missing_sections),
+        "Missing Sections": missing_sections,
+        "LLM Circuit": llm_circuit_breaker.state
+    }, 200
+
+
+def _run_conversion(key: str, content: bytes, profile: bool):
+    """
+    Run the pipeline once for a set of coalesced /convert requests.
+
+    Returns:
+        The response payload, status code and extra response headers
+    """
+    # Admitted first, so a request waiting on the lock is counted (or rejected).
+    # Duplicates handled by other worker processes wait on the lock, then reuse
+    # the stored extractions of the first run instead of calling the LLM again
+    with admission_controller.admit():
+        with process_lock(key):
+            if profile:
+                # cProfile only sees the thread that enabled it: run the extractions in it
+                with profile_request("convert") as profile_path:
+                    payload, status = _process_lc_upload(content, pipelined=False)
+                return payload, status, {'X-Profile-Artifact': profile_path.name}
+            payload, status = _process_lc_upload(content)
+            return payload, status, {}
+
+
 @app.route('/convert', methods=['POST'])
 def convert():
     try:
@@ -95,57 +205,28 @@ def convert():
             logger.error(f"Invalid file type: {file.filename}")
             return jsonify({"error": "Invalid file type. Only .txt files are supported."}), 400
 
-        filename = secure_filename(file.filename)
-        lc_file_path = Path(Config.LETTER_OF_CREDIT_FILE)
-        file.save(lc_file_path)
-
-        # Read and process Letter of Credit file
-        with open(lc_file_path, 'r', encoding='utf-8') as lc_file:
-            lc_text = lc_file.read()
-
-        lc_info = processor.process_letter_of_credit(lc_file_path)
-        if not lc_info:
-            logger.error("Failed to extract information from Letter of Credit.")
-            return jsonify({"error": "Processing failed. Unable to extract information."}), 500
+        content = file.read()
 
-        logger.info("Successfully processed Letter of Credit")
+        # Identical uploads (or the same Idempotency-Key) in flight share one run
+        key = request.headers.get('Idempotency-Key') or hashlib.sha256(content).hexdigest()
 
-        # Extract BOL, verification, and required documents
-        result, documents_list, verification_points = None, None, None
+        # Admin-only profiling: X-Profile header or ?profile= query flag carrying PROFILE_TOKEN
+        profile = profiling_requested(request.headers.get('X-Profile') or request.args.get('profile'))
 
-        if '46A' in lc_info:
-            bol_text = lc_info['46A']['value']
-            result = processor.process_bill_of_lading(bol_text)
-            documents_list = processor.process_documents(bol_text)
+        try:
+            (payload, status, headers), shared = single_flight.do(
+                key, lambda: _run_conversion(key, content, profile))
+            if shared:
+                logger.info(f"Coalesced /convert request with an identical one in flight ({key[:16]})")
 
-            if result:
-                result['Notify name and address'] = result.pop(
-                    'Notify name and address (or blank endorsed)', None)
-                logger.info("Extracted Bill of Lading data")
-            else:
-                logger.warning("No Bill of Lading data found")
-
-        if '47A' in lc_info:
-            verification_text = lc_info['47A']['value']
-            verification_points = processor.process_verification_points(verification_text)
-
-            if verification_points:
-                logger.info("Extracted verification points")
-            else:
-                logger.warning("No verification points extracted")
-
-        output_filename = f"{Path(Config.OUTPUT_FILE1).stem}_{lc_info.get('21', {}).get('value', 'UNKNOWN')}.docx"
-        final_output_path = Path(Config.OUTPUT_FILE1).parent / output_filename
-
-        process_and_fill_document(lc_info, result, verification_points, documents_list, {})
-
-        return jsonify({
-            "message": "Document processed successfully!",
-            "document_filename": output_filename,
-            "BOL Extraction": result or "No Bill of Lading data found",
-            "Verification Points": verification_points or "No verification points extracted",
-            "Required Documents": documents_list or "No required documents extracted"
-        }), 200
+            response = jsonify(payload)
+            response.headers.update(headers)
+            return response, status
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected /convert request: {str(e)}")
+            response = jsonify({"error": "Server busy. Please retry later.", "retry_after": e.retry_after})
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 429
 
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
@@ -156,14 +237,21 @@ def convert():
 def download_document():
     try:
         # Path to the latest generated document
-        document_path = Path(Config.OUTPUT_FILE1).parent
+        document_path = Path(Config.OUTPUT_FILES['bill_of_lading']).parent
         files = list(document_path.glob("*.docx"))  # Get all .docx files
+        artifacts = artifact_store.list_artifacts()  # Documents stored as deltas
 
-        if not files:
+        if not files and not artifacts:
             return jsonify({"error": "No processed documents found. Please process a Letter of Credit first."}), 404
 
         # Get the most recent file
-        latest_file = max(files, key=lambda f: f.stat().st_mtime)
+        latest_file = max(files, key=lambda f: f.stat().st_mtime, default=None)
+        latest_artifact = max(artifacts, key=lambda a: a['date'], default=None)
+
+        if latest_artifact and (latest_file is None or latest_artifact['date'] > latest_file.stat().st_mtime):
+            # Reassemble the document from the delta store
+            return send_file(BytesIO(artifact_store.load(latest_artifact['name'])), mimetype=DOCX_MIMETYPE,
+                             as_attachment=True, download_name=latest_artifact['name'])
 
         # Serve the file for download
         return send_file(latest_file, as_attachment=True)
@@ -173,6 +261,51 @@ def download_document():
         return jsonify({"error": "An unexpected error occurred while retrieving the document.", "details": str(e)}), 500
 
 
-# Run the Flask app
+@app.route('/download-lc/<path:lc_number>', methods=['GET'])
+def download_lc_documents(lc_number):
+    """Stream a zip of every document generated for an LC (field 21)."""
+    try:
+        entries = []
+        for output_path in Config.OUTPUT_FILES.values():
+            document_path = DocumentFiller.output_path_for(output_path, lc_number)
+            if document_path.is_file():
+                entries.append((document_path.name, document_path))
+            elif artifact_store.exists(document_path.name):
+                # Reassembled lazily, one document at a time
+                entries.append((document_path.name, None))
+
+        if not entries:
+            return jsonify({"error": f"No processed documents found for LC {lc_number}."}), 404
+
+        def members():
+            for name, content in entries:
+                yield name, content if content is not None else artifact_store.load(name)
+
+        archive_name = f"{DocumentFiller.output_path_for(Path('LC.zip'), lc_number).stem}.zip"
+        return Response(stream_with_context(stream_zip(members())), mimetype="application/zip",
+                        headers={"Content-Disposition": f"attachment; filename={archive_name}"})
+
+    except Exception as e:
+        logger.error(f"Error while streaming documents of LC {lc_number}: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred while retrieving the documents.", "details": str(e)}), 500
+
+
+@app.route('/storage-stats', methods=['GET'])
+def storage_stats():
+    """Disk usage of the delta store compared to storing every document in full."""
+    try:
+        return jsonify(artifact_store.stats())
+    except Exception as e:
+        logger.error(f"Error computing storage stats: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred.", "details": str(e)}), 500
+
+
+@app.route('/prompt-stats', methods=['GET'])
+def prompt_stats():
+    """Prompt-token and latency telemetry of each LLM extractor (of this worker process only)."""
+    return jsonify(PromptBuilder.telemetry())
+
+
+# Run the Flask development server (use gunicorn.conf.py in production)
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,238 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import zipfile
+import zlib
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from filelock import FileLock
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# ZipInfo attributes needed to rebuild a member byte for byte
+_MEMBER_ATTRIBUTES = ("date_time", "compress_type", "comment", "extra", "create_system",
+                      "create_version", "extract_version", "flag_bits", "internal_attr", "external_attr")
+
+
+class DeltaArtifactStore:
+    """
+    Content-addressed storage for generated .docx files.
+
+    A .docx is a zip archive and the documents generated from the same template
+    only differ by a few parts (mainly word/document.xml). Each zip member is
+    stored once as a blob named by its SHA-256, and every generated document is
+    a small JSON manifest listing its members, so the parts shared with the
+    template (styles, media, headers...) are kept on disk only once.
+
+    Re-rendering a document replaces its manifest and may leave blobs no longer
+    referenced: prune() deletes them (python -m src.artifact_store prune). A lock
+    file serializes store() and prune() across processes, so a blob found on disk
+    by store() cannot be deleted before its manifest is written.
+    """
+
+    def __init__(self, store_folder: Path = Config.ARTIFACT_STORE_FOLDER):
+        """
+        Initialize the store.
+
+        Args:
+            store_folder (Path): Folder holding the blobs and manifests
+        """
+        self.blob_folder = Path(store_folder) / "blobs"
+        self.manifest_folder = Path(store_folder) / "manifests"
+        self.lock_path = Path(store_folder) / "store.lock"
+        self.blob_folder.mkdir(parents=True, exist_ok=True)
+        self.manifest_folder.mkdir(parents=True, exist_ok=True)
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_folder / digest[:2] / digest
+
+    def _manifest_path(self, name: str) -> Path:
+        return self.manifest_folder / f"{name}.json"
+
+    def _write_blob(self, data: bytes) -> Tuple[str, int]:
+        """Store a blob (compressed) if it is not stored yet, returning its digest and the bytes written."""
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        if blob_path.exists():
+            return digest, 0
+        blob_path.parent.mkdir(exist_ok=True)
+        compressed = zlib.compress(data)
+        tmp_path = blob_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(compressed)
+        os.replace(tmp_path, blob_path)
+        return digest, len(compressed)
+
+    def _read_blob(self, digest: str) -> bytes:
+        return zlib.decompress(self._blob_path(digest).read_bytes())
+
+    def store(self, name: str, docx_bytes: bytes) -> bool:
+        """
+        Store a generated document as a manifest of shared blobs.
+
+        The manifest is only kept if rebuilding it gives back the exact same
+        bytes; otherwise the caller must keep the full file.
+
+        Args:
+            name (str): File name of the generated document
+            docx_bytes (bytes): Content of the generated document
+
+        Returns:
+            bool: True if the document was stored as a delta
+        """
+        try:
+            with FileLock(self.lock_path):
+                return self._store(name, docx_bytes)
+        except Exception as e:
+            logger.error(f"Error storing {name} as delta: {str(e)}")
+            return False
+
+    def _store(self, name: str, docx_bytes: bytes) -> bool:
+        """Write the blobs and the manifest of a document, under the store lock."""
+        members = []
+        new_bytes = 0
+        with zipfile.ZipFile(BytesIO(docx_bytes)) as archive:
+            comment = archive.comment
+            for info in archive.infolist():
+                digest, written = self._write_blob(archive.read(info))
+                new_bytes += written
+                member = {attribute: getattr(info, attribute) for attribute in _MEMBER_ATTRIBUTES}
+                member["comment"] = member["comment"].hex()
+                member["extra"] = member["extra"].hex()
+                member["name"] = info.filename
+                member["blob"] = digest
+                members.append(member)
+
+        manifest = {
+            "name": name,
+            "size": len(docx_bytes),
+            "sha256": hashlib.sha256(docx_bytes).hexdigest(),
+            "comment": comment.hex(),
+            "members": members
+        }
+
+        if self._assemble(manifest) != docx_bytes:
+            logger.warning(f"Delta storage of {name} is not byte-identical, keeping the full file")
+            return False
+
+        manifest_path = self._manifest_path(name)
+        tmp_path = manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+        logger.info(f"Stored {name} as delta: {len(docx_bytes)} bytes, {new_bytes} new blob bytes")
+        return True
+
+    def _assemble(self, manifest: Dict) -> bytes:
+        """Rebuild the zip archive described by a manifest."""
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.comment = bytes.fromhex(manifest["comment"])
+            for member in manifest["members"]:
+                info = zipfile.ZipInfo(member["name"], date_time=tuple(member["date_time"]))
+                for attribute in _MEMBER_ATTRIBUTES[1:]:
+                    setattr(info, attribute, member[attribute])
+                info.comment = bytes.fromhex(member["comment"])
+                info.extra = bytes.fromhex(member["extra"])
+                archive.writestr(info, self._read_blob(member["blob"]))
+        return buffer.getvalue()
+
+    def exists(self, name: str) -> bool:
+        """Check whether a document is stored as a delta."""
+        return self._manifest_path(name).exists()
+
+    def load(self, name: str) -> Optional[bytes]:
+        """
+        Reassemble a stored document.
+
+        Args:
+            name (str): File name of the generated document
+
+        Returns:
+            Optional[bytes]: The full .docx content, or None if it is not stored
+        """
+        manifest_path = self._manifest_path(name)
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        return self._assemble(manifest)
+
+    def list_artifacts(self) -> List[Dict]:
+        """
+        List the stored documents.
+
+        Returns:
+            List[Dict]: Name, full size and modification time of each document
+        """
+        artifacts = []
+        for manifest_path in self.manifest_folder.glob("*.json"):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            artifacts.append({
+                "name": manifest["name"],
+                "size": manifest["size"],
+                "date": manifest_path.stat().st_mtime
+            })
+        return artifacts
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Measure the disk saving of the store.
+
+        Returns:
+            Dict[str, int]: Full size of the stored documents and bytes actually used on disk
+        """
+        logical_bytes = sum(artifact["size"] for artifact in self.list_artifacts())
+        stored_bytes = sum(path.stat().st_size for path in self.blob_folder.rglob("*") if path.is_file())
+        stored_bytes += sum(path.stat().st_size for path in self.manifest_folder.glob("*.json"))
+        return {
+            "documents_bytes": logical_bytes,
+            "stored_bytes": stored_bytes,
+            "saved_bytes": logical_bytes - stored_bytes
+        }
+
+    def prune(self) -> int:
+        """
+        Delete the blobs no longer referenced by any manifest, under the store lock.
+
+        Returns:
+            int: Number of deleted blobs
+        """
+        with FileLock(self.lock_path):
+            return self._prune()
+
+    def _prune(self) -> int:
+        referenced = set()
+        for manifest_path in self.manifest_folder.glob("*.json"):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                referenced.update(member["blob"] for member in json.load(f)["members"])
+
+        deleted = 0
+        for blob_path in self.blob_folder.rglob("*"):
+            if blob_path.is_file() and blob_path.name not in referenced:
+                blob_path.unlink()
+                deleted += 1
+        return deleted
+
+
+def main():
+    """Maintain the delta store from the command line."""
+    parser = argparse.ArgumentParser(description="Maintain the delta store of generated documents.")
+    parser.add_argument("command", choices=["prune", "stats"],
+                        help="prune: delete the unreferenced blobs, stats: show the disk saving")
+    args = parser.parse_args()
+
+    store = DeltaArtifactStore()
+    if args.command == "prune":
+        print(f"Deleted {store.prune()} unreferenced blob(s)")
+    else:
+        print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Memory budget benchmark of the pipeline stages.
+
+Runs the local stages of the pipeline on synthetic LCs of increasing size
+(5 KB to 5 MB by default) and reports, per stage and end to end:
+    - the peak of Python allocations (tracemalloc), which includes numpy,
+      scipy and spaCy buffers but not the lxml trees of python-docx, and
+    - the peak RSS increase of the process (Linux, measured in a separate
+      run without tracemalloc, whose own bookkeeping would inflate it), which
+      covers everything. The stages run one after the other in a warm process,
+      whose heap earlier stages already grew, so the end-to-end RSS peak is
+      measured in a fresh process for each size.
+
+Stages: LC parsing ("lc_parser"), preprocessing and paragraph split of 46A
+("preprocess"), paragraph matching ("matcher") and filling of every template
+("render"). The LLM extractions run remotely and are not measured: the
+rendering stage uses fixed extraction results.
+
+Each traced peak is checked against its budget, Config.MEMORY_BUDGETS:
+    {"<stage>": [base MB, MB per MB of LC], ...}
+and the end-to-end RSS peak against Config.MEMORY_BUDGET_RSS_MB. The exit
+status is 1 if any budget is exceeded, so the benchmark can gate a build.
+
+Usage:
+    python -m src.benchmark_memory [--sizes 5K 50K 500K 5M] [--output results.json] [--report-only]
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.config import Config
+from src.logging_setup import configure_logging
+from src.main import DocumentProcessor, process_and_fill_document
+
+MB = 1024 * 1024
+SIZE_UNITS = {"K": 1024, "M": MB}
+
+# Clauses repeated to build synthetic fields of any size
+DOCUMENT_CLAUSES = [
+    "FULL SET OF CLEAN ON BOARD OCEAN BILLS OF LADING MADE OUT TO THE ORDER OF ISSUING BANK "
+    "MARKED FREIGHT PREPAID AND NOTIFY APPLICANT WITH FULL ADDRESS",
+    "SIGNED COMMERCIAL INVOICE IN 3 ORIGINALS AND 2 COPIES INDICATING HS CODE : 31021010 AND LC NUMBER",
+    "CERTIFICATE OF ORIGIN ISSUED BY THE CHAMBER OF COMMERCE IN 1 ORIGINAL AND 2 COPIES",
+    "CERTIFICATE OF QUALITY AND WEIGHT ISSUED BY SGS AT LOAD PORT SHOWING NITROGEN 46 PCT MIN",
+    "PACKING LIST IN 3 COPIES SHOWING GROSS AND NET WEIGHT OF 40000 MT",
+]
+CONDITION_CLAUSES = [
+    "ALL DOCUMENTS MUST BEAR THE LC NUMBER AND DATE OF ISSUE",
+    "THIRD PARTY DOCUMENTS EXCEPT INVOICE AND DRAFTS ARE ACCEPTABLE",
+    "A DISCREPANCY FEE OF USD 100.00 WILL BE DEDUCTED FROM THE PROCEEDS",
+    "SHORT FORM OR BLANK BACK BILLS OF LADING ARE NOT ACCEPTABLE",
+]
+# Extraction results used to fill the templates
+SAMPLE_EXTRACTIONS = {
+    "BOL Extraction": {
+        "Number of Negotiable copies": "3", "Number of Non-Negotiable copies": "3",
+        "Notify name and address": "ACME TRADING CO", "Consignee name and address": "TO ORDER OF BANK",
+        "Freight payment type": "Prepaid",
+    },
+    "Required Documents": "- Facture commerciale (3 originaux)\n- Connaissement (3/3 originaux)",
+    "Verification Points": "- Clean on board bill of lading\n- Marked freight prepaid",
+}
+
+
+def parse_size(size: str) -> int:
+    """Parse a size such as "5K", "500K" or "5M" into bytes."""
+    size = size.strip().upper()
+    if size[-1] in SIZE_UNITS:
+        return int(float(size[:-1]) * SIZE_UNITS[size[-1]])
+    return int(size)
+
+
+def _numbered(clauses: List[str], size: int) -> str:
+    lines, total, number = [], 0, 1
+    while total < size:
+        line = f"{number}. {clauses[(number - 1) % len(clauses)]}"
+        lines.append(line)
+        total += len(line) + 1
+        number += 1
+    return "\n".join(lines)
+
+
+def synthetic_lc(size: int) -> str:
+    """Build an MT700-like LC of about `size` bytes, most of it in 46A, then 47A and 45A."""
+    header = (":20: REF2024001\n:21: LC2024/00123\n:31C: 240115\n"
+              ":50: ACME TRADING CO 12 RUE DU PORT CASABLANCA MOROCCO\n"
+              ":59: GLOBAL EXPORTS LTD 45 HARBOUR ROAD MUMBAI INDIA\n"
+              ":44E: NHAVA SHEVA PORT, INDIA\n:44F: CASABLANCA PORT, MOROCCO\n")
+    body_size = max(size - len(header), 0)
+    goods = ("40000 MT UREA 46 PCT NITROGEN IN BULK " * (body_size // 10 // 38 + 1))[:max(body_size // 10, 38)]
+    return (header
+            + f":45A: {goods}\n"
+            + f":46A: {_numbered(DOCUMENT_CLAUSES, body_size * 7 // 10)}\n"
+            + f":47A: {_numbered(CONDITION_CLAUSES, body_size * 2 // 10)}\n"
+            + ":71B: ALL CHARGES OUTSIDE MOROCCO ARE FOR BENEFICIARY ACCOUNT\n")
+
+
+def _read_status(field: str) -> Optional[int]:
+    """Read a memory field of /proc/self/status (e.g. VmRSS, VmHWM), in bytes."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the process peak RSS (VmHWM) to the current RSS, where the kernel supports it."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measure(stage: Callable[[], object]) -> Dict:
+    """
+    Run a stage twice: untraced for its RSS peak, then under tracemalloc for its allocation peak.
+
+    Returns:
+        Dict: "traced_peak" and "rss_peak" (bytes, None if unavailable) and "seconds" (untraced run)
+    """
+    gc.collect()
+    rss_before = _read_status("VmRSS")
+    resettable = _reset_peak_rss()
+    started_at = time.perf_counter()
+    stage()
+    seconds = time.perf_counter() - started_at
+    rss_peak = None
+    if resettable and rss_before is not None:
+        rss_peak = max(_read_status("VmHWM") - rss_before, 0)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stage()
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"traced_peak": traced_peak, "rss_peak": rss_peak, "seconds": seconds}
+
+
+def _fill(processor: DocumentProcessor, lc_info: Dict, output_files: Dict[str, Path]) -> None:
+    context = processor.create_context(lc_info)
+    context.extractions = dict(SAMPLE_EXTRACTIONS)
+    process_and_fill_document(context, output_files)
+
+
+def _end_to_end(processor: DocumentProcessor, text: str, reference_paragraphs: List[str],
+                output_files: Dict[str, Path], render: bool) -> None:
+    lc_info = processor.lc_extractor.extract_lc_info(text)
+    paragraphs = processor.preprocessor.separate_paragraphs(
+        processor.preprocessor.preprocess_text(lc_info["46A"]["value"]))
+    processor.matcher.find_similar_paragraphs(paragraphs, reference_paragraphs)
+    if render:
+        _fill(processor, lc_info, output_files)
+
+
+def _fresh_end_to_end_rss(size: int, output_folder: str, render: bool) -> Optional[int]:
+    """Peak RSS increase of one end-to-end run, in this new process (bytes, None if unavailable)."""
+    processor = DocumentProcessor()
+    text = synthetic_lc(size)
+    reference_paragraphs = Config.BL_REFERENCE_PARAGRAPHS or DOCUMENT_CLAUSES[:1]
+    output_files = {name: Path(output_folder) / Path(path).name for name, path in Config.OUTPUT_FILES.items()}
+
+    gc.collect()
+    rss_before = _read_status("VmRSS")
+    if not _reset_peak_rss() or rss_before is None:
+        return None
+    _end_to_end(processor, text, reference_paragraphs, output_files, render)
+    return max(_read_status("VmHWM") - rss_before, 0)
+
+
+def measure_end_to_end_rss(size: int, output_folder: Path, render: bool) -> Optional[int]:
+    """
+    Measure the end-to-end RSS peak in a fresh (spawned) process, whose heap no
+    earlier run has grown: the only measurement seeing a regression of the
+    memory outside Python's allocator (lxml, numpy buffers...).
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_fresh_end_to_end_rss, size, str(output_folder), render).result()
+
+
+def run_sizes(processor: DocumentProcessor, sizes: List[int], output_folder: Path) -> List[Dict]:
+    """
+    Measure every stage, and the whole pipeline, for each LC size.
+
+    Args:
+        processor (DocumentProcessor): Document processor
+        sizes (List[int]): LC sizes in bytes
+        output_folder (Path): Folder receiving the rendered documents
+
+    Returns:
+        List[Dict]: One row per size and stage
+    """
+    reference_paragraphs = Config.BL_REFERENCE_PARAGRAPHS or DOCUMENT_CLAUSES[:1]
+    output_files = {name: output_folder / Path(path).name for name, path in Config.OUTPUT_FILES.items()}
+    render = all(Path(path).exists() for path in Config.TEMPLATE_FILES.values())
+    if not render:
+        print("Templates missing, the render stage is skipped", file=sys.stderr)
+
+    rows = []
+    for size in sizes:
+        text = synthetic_lc(size)
+        lc_info = processor.lc_extractor.extract_lc_info(text)
+        paragraphs = processor.preprocessor.separate_paragraphs(
+            processor.preprocessor.preprocess_text(lc_info["46A"]["value"]))
+        stages = {
+            "lc_parser": lambda: processor.lc_extractor.extract_lc_info(text),
+            "preprocess": lambda: processor.preprocessor.separate_paragraphs(
+                processor.preprocessor.preprocess_text(lc_info["46A"]["value"])),
+            "matcher": lambda: processor.matcher.find_similar_paragraphs(paragraphs, reference_paragraphs),
+        }
+        if render:
+            stages["render"] = lambda: _fill(processor, lc_info, output_files)
+        stages["end_to_end"] = lambda: _end_to_end(processor, text, reference_paragraphs, output_files, render)
+
+        for stage, run in stages.items():
+            rows.append({"size": len(text.encode("utf-8")), "stage": stage, "paragraphs": len(paragraphs),
+                         **measure(run)})
+        # The warm RSS peak of end_to_end misses what earlier stages already allocated
+        rows[-1]["rss_peak"] = measure_end_to_end_rss(size, output_folder, render)
+    return rows
+
+
+def check_budgets(rows: List[Dict]) -> List[str]:
+    """
+    Compare the measurements with Config.MEMORY_BUDGETS and Config.MEMORY_BUDGET_RSS_MB.
+
+    Returns:
+        List[str]: One message per exceeded budget
+    """
+    violations = []
+    for row in rows:
+        size_mb = row["size"] / MB
+        budget = Config.MEMORY_BUDGETS.get(row["stage"])
+        if budget:
+            limit = (budget[0] + budget[1] * size_mb) * MB
+            row["budget"] = limit
+            if row["traced_peak"] > limit:
+                violations.append(f"{row['stage']} at {size_mb:.2f} MB: traced peak "
+                                  f"{row['traced_peak'] / MB:.1f} MB > budget {limit / MB:.1f} MB")
+        if row["stage"] == "end_to_end" and row["rss_peak"] is not None \
+                and row["rss_peak"] > Config.MEMORY_BUDGET_RSS_MB * MB:
+            violations.append(f"end_to_end at {size_mb:.2f} MB: RSS peak {row['rss_peak'] / MB:.1f} MB "
+                              f"> budget {Config.MEMORY_BUDGET_RSS_MB} MB")
+    return violations
+
+
+def format_table(rows: List[Dict]) -> str:
+    """Render the measurements as a markdown table."""
+    lines = ["| LC size | Stage | Traced peak (MB) | Budget (MB) | RSS peak (MB) | Time (s) |",
+             "|---|---|---|---|---|---|"]
+    for row in rows:
+        budget = f"{row['budget'] / MB:.1f}" if "budget" in row else "-"
+        rss = f"{row['rss_peak'] / MB:.1f}" if row["rss_peak"] is not None else "-"
+        lines.append(f"| {row['size'] / 1024:.0f} KB | {row['stage']} | {row['traced_peak'] / MB:.1f} | {budget} "
+                     f"| {rss} | {row['seconds']:.2f} |")
+    return "\n".join(lines)
+
+
+def main():
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Memory budget benchmark of the pipeline stages.")
+    parser.add_argument("--sizes", nargs="+", default=["5K", "50K", "500K", "5M"], help="LC sizes (e.g. 5K 5M)")
+    parser.add_argument("--output", type=Path, help="Write the raw results to this JSON file")
+    parser.add_argument("--report-only", action="store_true", help="Do not fail when a budget is exceeded")
+    args = parser.parse_args()
+
+    configure_logging(Config.LOG_FOLDER / "benchmark_memory.log", console=False)
+    processor = DocumentProcessor()
+    with tempfile.TemporaryDirectory() as output_folder:
+        rows = run_sizes(processor, [parse_size(size) for size in args.sizes], Path(output_folder))
+
+    violations = check_budgets(rows)
+    print(format_table(rows))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+    for violation in violations:
+        print(f"Budget exceeded: {violation}", file=sys.stderr)
+    if violations and not args.report_only:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark of the template renderers: python-docx (DocumentFiller) against the
+raw OOXML renderer (OOXMLRenderer).
+
+Fills each template with the same data using both renderers, checks that they
+produce the same word/document.xml and reports the mean fill + save time.
+
+Usage:
+    python -m src.benchmark_renderer [--runs 50] [--template PATH ...]
+"""
+import argparse
+import time
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from statistics import mean
+from typing import Callable, Dict
+
+from src.config import Config
+from src.models.ooxml_renderer import OOXMLRenderer, DOCUMENT_PART
+from src.models.template_document_filler import DocumentFiller
+
+# Representative filling data (keys of List_information_gen and the BOL extraction)
+SAMPLE_DATA = {
+    "20": "REF2024001", "21": "LC2024/00123", "31C": "240115",
+    "50": "ACME TRADING CO 12 RUE DU PORT CASABLANCA MOROCCO",
+    "59": "GLOBAL EXPORTS LTD 45 HARBOUR ROAD MUMBAI INDIA",
+    "44E": "NHAVA SHEVA PORT, INDIA", "44F": "CASABLANCA PORT, MOROCCO",
+    "45A": "40000 METRIC TONS OF UREA 46 PCT NITROGEN IN BULK", "gross weight": "40000",
+    "Number of Negotiable copies": "3", "Number of Non-Negotiable copies": "3",
+    "Notify name and address": "ACME TRADING CO", "Consignee name and address": "TO ORDER OF BANK",
+    "Freight payment type": "Prepaid",
+    "Verification Points": "- Clean on board bill of lading\n- Marked freight prepaid\n- Notify applicant",
+    "Required Documents": "- Facture commerciale (3 originaux)\n- Connaissement (3/3 originaux)",
+}
+
+
+def _python_docx(template_path: Path, data: Dict) -> bytes:
+    filler = DocumentFiller(template_path)
+    filler.fill_document(data)
+    buffer = BytesIO()
+    filler.document.save(buffer)
+    return buffer.getvalue()
+
+
+def _ooxml(template_path: Path, data: Dict) -> bytes:
+    renderer = OOXMLRenderer(template_path)
+    renderer.fill_document(data)
+    return renderer.render()
+
+
+def _time(render: Callable[[Path, Dict], bytes], template_path: Path, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        render(template_path, SAMPLE_DATA)
+        durations.append(time.perf_counter() - started_at)
+    return mean(durations)
+
+
+def main():
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark python-docx against the raw OOXML renderer.")
+    parser.add_argument("--runs", type=int, default=50, help="Renders per template and renderer")
+    parser.add_argument("--template", type=Path, action="append", help="Template to benchmark (default: all)")
+    args = parser.parse_args()
+
+    template_paths = args.template or list(Config.TEMPLATE_FILES.values())
+    DocumentFiller.preload_templates(template_paths)
+
+    print("| Template | python-docx (ms) | OOXML (ms) | Speedup | Same document.xml |")
+    print("|---|---|---|---|---|")
+    for template_path in template_paths:
+        same = (zipfile.ZipFile(BytesIO(_python_docx(template_path, SAMPLE_DATA))).read(DOCUMENT_PART)
+                == zipfile.ZipFile(BytesIO(_ooxml(template_path, SAMPLE_DATA))).read(DOCUMENT_PART))
+        python_docx_time = _time(_python_docx, template_path, args.runs)
+        ooxml_time = _time(_ooxml, template_path, args.runs)
+        print(f"| {Path(template_path).name} | {python_docx_time * 1000:.1f} | {ooxml_time * 1000:.1f} "
+              f"| {python_docx_time / ooxml_time:.1f}x | {'yes' if same else 'NO'} |")
+
+
+if __name__ == "__main__":
+    main()
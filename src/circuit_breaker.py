@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from collections import deque
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over the last calls to a dependency.
+
+    It opens when, over a sliding window, the share of failed or slow calls
+    reaches a threshold. While open, calls are refused immediately. After a
+    cooldown a single trial call is let through (half-open): its success closes
+    the circuit, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, window: int, failure_rate: float, min_calls: int,
+                 slow_call_seconds: float, cooldown_seconds: float):
+        """
+        Args:
+            name (str): Name of the protected dependency, for logging
+            window (int): Number of recent calls considered
+            failure_rate (float): Share of failed or slow calls that opens the circuit
+            min_calls (int): Minimum calls in the window before it can open
+            slow_call_seconds (float): Calls slower than this count as failures
+            cooldown_seconds (float): Time the circuit stays open before a trial call
+        """
+        self.name = name
+        self.outcomes = deque(maxlen=window)
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """Check whether calls are currently refused (open and still cooling down)."""
+        with self.lock:
+            return self.state == self.OPEN and time.monotonic() - self.opened_at < self.cooldown_seconds
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a call may go through, starting a trial call after the cooldown.
+
+        Returns:
+            bool: True if the call may be made
+        """
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = self.HALF_OPEN
+                logger.info(f"{self.name} circuit half-open, trying one call")
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back an allowed call that was not made, without recording an outcome."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record(self, success: bool, duration: float) -> None:
+        """
+        Record the outcome of a call.
+
+        Args:
+            success (bool): Whether the call succeeded
+            duration (float): Call duration in seconds
+        """
+        failed = not success or duration > self.slow_call_seconds
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.trial_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = self.CLOSED
+                    self.outcomes.clear()
+                    logger.info(f"{self.name} circuit closed")
+                return
+
+            self.outcomes.append(failed)
+            if (self.state == self.CLOSED and len(self.outcomes) >= self.min_calls
+                    and sum(self.outcomes) / len(self.outcomes) >= self.failure_rate):
+                self._open()
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.outcomes.clear()
+        logger.error(f"{self.name} circuit open for {self.cooldown_seconds}s")
+
+
+# Shared by every LLM extractor of the process
+llm_circuit_breaker = CircuitBreaker(
+    "LLM",
+    window=Config.BREAKER_WINDOW,
+    failure_rate=Config.BREAKER_FAILURE_RATE,
+    min_calls=Config.BREAKER_MIN_CALLS,
+    slow_call_seconds=Config.BREAKER_SLOW_CALL_SECONDS,
+    cooldown_seconds=Config.BREAKER_COOLDOWN_SECONDS
+)
@@ -1,3 +1,4 @@
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -15,8 +16,45 @@ class Config:
 
     # Model configurations
     MAX_EXAMPLE_TOKENS = int(os.getenv("MAX_EXAMPLE_TOKENS", 1024))
+    MAX_PROMPT_TOKENS = int(os.getenv("MAX_PROMPT_TOKENS", 4096))
     SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
 
+    # LLM rate limits (per worker process, shared by all extractors)
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 500))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", 200000))
+    LLM_RATE_LIMIT_TIMEOUT = float(os.getenv("LLM_RATE_LIMIT_TIMEOUT", 30))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+
+    # Stream completions and stop reading once the JSON object closes / the list is long enough
+    LLM_STREAMING = os.getenv("LLM_STREAMING", "true").lower() == "true"
+    LLM_MAX_LIST_ITEMS = int(os.getenv("LLM_MAX_LIST_ITEMS", 30))
+
+    # LLM circuit breaker: opens when BREAKER_FAILURE_RATE of the last BREAKER_WINDOW
+    # calls failed or took over BREAKER_SLOW_CALL_SECONDS, for BREAKER_COOLDOWN_SECONDS
+    LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", 30))
+    BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", 20))
+    BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", 5))
+    BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", 0.5))
+    BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", 20))
+    BREAKER_COOLDOWN_SECONDS = float(os.getenv("BREAKER_COOLDOWN_SECONDS", 60))
+
+    # Degraded mode: time budget of the LLM extractions of one LC, and the text
+    # put in the documents for the sections that could not be extracted
+    EXTRACTION_DEADLINE = float(os.getenv("EXTRACTION_DEADLINE", 60))
+    MISSING_SECTION_TEXT = os.getenv("MISSING_SECTION_TEXT", "[TO BE COMPLETED]")
+
+    # Start the 46A/47A extractions while the rest of the LC is still being parsed
+    PIPELINED_EXTRACTION = os.getenv("PIPELINED_EXTRACTION", "true").lower() == "true"
+
+    # Admission control in front of the processing pipeline
+    PIPELINE_CONCURRENCY = int(os.getenv("PIPELINE_CONCURRENCY", 4))
+    ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", 16))
+
+    # Logging: JSON lines written by a background thread, rotated by size
+    LOG_FOLDER = BASE_PATH / "logs"
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+
     # File paths (relative, for better portability)
     EXAMPLES_FILE = BASE_PATH / "data/examples/bol-examples.txt"
     LETTER_OF_CREDIT_FILE = BASE_PATH / "data/input/letters_of_credit/letter_of_credit.txt"
@@ -30,6 +68,10 @@ class Config:
         "bank_letter": BASE_PATH / "data/input/templates/LETTRE_D_ENVOI_BANQUE_RAS_GHUMAYS_DAP_temp.docx"
     }
 
+    # Templates filled by OOXMLRenderer (rewrites word/document.xml only) instead of python-docx,
+    # e.g. OOXML_TEMPLATES=bill_of_lading,bank_letter
+    OOXML_TEMPLATES = [name.strip() for name in os.getenv("OOXML_TEMPLATES", "").split(",") if name.strip()]
+
     # Output files
     OUTPUT_FILES = {
         "bill_of_lading": BASE_PATH / "data/output/Bill_of_Lading.docx",
@@ -40,6 +82,51 @@ class Config:
     # Folder for uploads
     UPLOAD_FOLDER = BASE_PATH / "data/output"
 
+    # Storage of generated documents: "full" (one .docx per output) or "delta"
+    # (parts shared between outputs stored once, see src/artifact_store.py)
+    ARTIFACT_STORAGE = os.getenv("ARTIFACT_STORAGE", "full")
+    ARTIFACT_STORE_FOLDER = BASE_PATH / "data/output/.artifacts"
+
+    # On-demand request profiling (disabled unless a token is set)
+    PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+    PROFILE_FOLDER = BASE_PATH / "data/profiles"
+
+    # Pipeline modes, compared by src/evaluate.py
+    LC_PARSER_MODE = os.getenv("LC_PARSER_MODE", "spacy")  # "spacy" or "regex"
+    MATCHER_MODE = os.getenv("MATCHER_MODE", "tfidf")  # "tfidf" or "hashed"
+    PROMPT_MODE = os.getenv("PROMPT_MODE", "full")  # "full" or "pruned"
+    PRUNED_PROMPT_TOKENS = int(os.getenv("PRUNED_PROMPT_TOKENS", 600))
+    EVALUATION_CORPUS = BASE_PATH / "data/evaluation"
+
+    # Stored per-LC extraction state, for incremental re-extraction of amendments
+    LC_STATE_FOLDER = BASE_PATH / "data/cache/lc_state"
+
+    # Lock files coalescing identical conversions across worker processes: keys are
+    # hashed onto a fixed set of LOCK_SLOTS files, so the folder does not grow. A lock
+    # is held for a whole conversion: keep the slots far above the concurrent requests
+    # (64 requests over 65536 slots: ~3% chance that two unrelated ones wait for each other)
+    LOCK_FOLDER = BASE_PATH / "data/cache/locks"
+    LOCK_SLOTS = int(os.getenv("LOCK_SLOTS", 65536))
+
+    # CLI batch mode (python -m src.main <dir or glob>...)
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", os.cpu_count() or 1))
+    BATCH_OUTPUT_FOLDER = BASE_PATH / "data/output/batch"
+
+    # Memory budgets checked by src/benchmark_memory.py: traced allocation peak per
+    # stage as [base MB, MB per MB of LC], and end-to-end peak RSS increase in MB
+    MEMORY_BUDGETS = json.loads(os.getenv("MEMORY_BUDGETS", json.dumps({
+        "lc_parser": [8, 60], "preprocess": [4, 15], "matcher": [4, 12], "render": [32, 4], "end_to_end": [40, 60]
+    })))
+    MEMORY_BUDGET_RSS_MB = float(os.getenv("MEMORY_BUDGET_RSS_MB", 400))
+
+    # Production server (gunicorn prefork, see gunicorn.conf.py). Admission control is
+    # per worker: a worker needs more threads than PIPELINE_CONCURRENCY + ADMISSION_QUEUE_SIZE
+    # to ever see a request beyond its queue, and reject it with a 429
+    SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:5000")
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", os.cpu_count() or 1))
+    SERVER_THREADS = int(os.getenv("SERVER_THREADS", PIPELINE_CONCURRENCY + ADMISSION_QUEUE_SIZE + 1))
+    SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", 120))
+
     # Reference paragraphs
     BL_REFERENCE_PARAGRAPHS = [
     ]
@@ -0,0 +1,209 @@
+"""
+Accuracy-vs-latency benchmark of the pipeline modes.
+
+Runs DocumentProcessor over a labelled LC corpus under every combination of
+LC parser (spaCy/regex), paragraph matcher (TF-IDF/hashed) and prompt
+(full/pruned) modes, scores the extractions against the gold labels and
+prints a Pareto table.
+
+Corpus layout (Config.EVALUATION_CORPUS): one `<name>.txt` LC per sample and
+its labels in `<name>.gold.json`:
+    {
+        "lc_info": {"21": "ABC123", "44E": "CASABLANCA PORT", ...},
+        "bol": {"Freight payment type": "Prepaid", ...},
+        "documents": ["Facture commerciale en 3 originaux", ...]
+    }
+Any of the three sections may be omitted.
+
+Usage:
+    python -m src.evaluate [--corpus DIR] [--output results.json]
+"""
+import argparse
+import itertools
+import json
+import logging
+import re
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+from statistics import mean
+from typing import Dict, List, Optional
+
+from src.config import Config
+from src.logging_setup import configure_logging
+from src.main import DocumentProcessor
+
+logger = logging.getLogger(__name__)
+
+# Modes compared, as Config attribute -> values
+MODES = {
+    "LC_PARSER_MODE": ["spacy", "regex"],
+    "MATCHER_MODE": ["tfidf", "hashed"],
+    "PROMPT_MODE": ["full", "pruned"],
+}
+
+# Minimum similarity for a predicted document to match a gold one
+DOCUMENT_MATCH_THRESHOLD = 0.8
+
+
+def _normalize(value) -> str:
+    """Compare values regardless of case and spacing (spaCy tokens are re-joined with spaces)."""
+    return re.sub(r'\s+', '', str(value or '')).casefold()
+
+
+def _bullet_items(text: Optional[str]) -> List[str]:
+    items = [re.sub(r'^\s*(?:[-*•]|\d+[.)])\s*', '', line) for line in (text or '').splitlines()]
+    return [item for item in items if item.strip()]
+
+
+def score_fields(predicted: Dict, gold: Dict) -> float:
+    """Fraction of gold fields whose predicted value matches."""
+    matches = [_normalize(predicted.get(key)) == _normalize(value) for key, value in gold.items()]
+    return mean(matches) if matches else 0.0
+
+
+def score_documents(predicted: Optional[str], gold: List[str]) -> float:
+    """F1 between the predicted bullet list and the gold document list."""
+    remaining = [_normalize(document) for document in gold]
+    predicted_items = [_normalize(item) for item in _bullet_items(predicted)]
+    true_positives = 0
+    for item in predicted_items:
+        best = max(remaining, key=lambda document: SequenceMatcher(None, item, document).ratio(), default=None)
+        if best is not None and SequenceMatcher(None, item, best).ratio() >= DOCUMENT_MATCH_THRESHOLD:
+            remaining.remove(best)
+            true_positives += 1
+    if not true_positives:
+        return 0.0
+    precision = true_positives / len(predicted_items)
+    recall = true_positives / len(gold)
+    return 2 * precision * recall / (precision + recall)
+
+
+def load_corpus(corpus_folder: Path) -> List[Dict]:
+    """Load the (LC text, gold labels) samples of a corpus folder."""
+    samples = []
+    for lc_path in sorted(Path(corpus_folder).glob("*.txt")):
+        gold_path = lc_path.with_suffix(".gold.json")
+        if not gold_path.exists():
+            logger.warning(f"No gold labels for {lc_path.name}, skipping")
+            continue
+        with open(gold_path, "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        samples.append({"name": lc_path.stem, "text": lc_path.read_text(encoding="utf-8"), "gold": gold})
+    return samples
+
+
+def evaluate_sample(processor: DocumentProcessor, sample: Dict) -> Dict:
+    """Run the pipeline stages on one LC, timing each stage and scoring the results."""
+    gold = sample["gold"]
+    latencies = {}
+
+    started_at = time.perf_counter()
+    lc_info = processor.lc_extractor.extract_lc_info(sample["text"])
+    latencies["lc_parser"] = time.perf_counter() - started_at
+
+    context = processor.create_context(lc_info)
+    extractions = {}
+    for name in processor.EXTRACTION_SOURCES:
+        started_at = time.perf_counter()
+        extractions[name] = processor._run_extraction(name, context)
+        latencies[name] = time.perf_counter() - started_at
+
+    scores = {}
+    if "lc_info" in gold:
+        predicted = {code: field["value"] for code, field in lc_info.items()}
+        scores["lc_info"] = score_fields(predicted, gold["lc_info"])
+    if "bol" in gold:
+        scores["bol"] = score_fields(extractions["BOL Extraction"] or {}, gold["bol"])
+    if "documents" in gold:
+        scores["documents"] = score_documents(extractions["Required Documents"], gold["documents"])
+
+    return {"scores": scores, "latencies": latencies}
+
+
+def pareto_front(rows: List[Dict]) -> None:
+    """Flag the rows no other row beats on both accuracy and latency."""
+    for row in rows:
+        row["pareto"] = not any(
+            other["accuracy"] >= row["accuracy"] and other["latency"] <= row["latency"]
+            and (other["accuracy"] > row["accuracy"] or other["latency"] < row["latency"])
+            for other in rows
+        )
+
+
+def run_evaluation(corpus_folder: Path) -> List[Dict]:
+    """
+    Evaluate every combination of modes over the corpus.
+
+    Args:
+        corpus_folder (Path): Folder holding the labelled LCs
+
+    Returns:
+        List[Dict]: One row per combination, with mean scores and latencies
+    """
+    samples = load_corpus(corpus_folder)
+    if not samples:
+        raise ValueError(f"No labelled LC found in {corpus_folder}")
+
+    processor = DocumentProcessor()
+    original_modes = {attribute: getattr(Config, attribute) for attribute in MODES}
+    rows = []
+    try:
+        for combination in itertools.product(*MODES.values()):
+            modes = dict(zip(MODES, combination))
+            for attribute, value in modes.items():
+                setattr(Config, attribute, value)
+            logger.info(f"Evaluating modes {modes}")
+
+            results = [evaluate_sample(processor, sample) for sample in samples]
+            score_names = {name for result in results for name in result["scores"]}
+            scores = {name: mean(r["scores"][name] for r in results if name in r["scores"]) for name in score_names}
+            latencies = {stage: mean(r["latencies"][stage] for r in results) for stage in results[0]["latencies"]}
+            rows.append({
+                "modes": modes,
+                "scores": scores,
+                "latencies": latencies,
+                "accuracy": mean(scores.values()) if scores else 0.0,
+                "latency": sum(latencies.values())
+            })
+    finally:
+        for attribute, value in original_modes.items():
+            setattr(Config, attribute, value)
+
+    pareto_front(rows)
+    return rows
+
+
+def format_table(rows: List[Dict]) -> str:
+    """Render the results as a markdown table, most accurate first."""
+    stages = list(rows[0]["latencies"])
+    header = ["LC parser", "Matcher", "Prompt", "Accuracy", "lc_info", "BOL", "Documents"]
+    header += [f"{stage} (ms)" for stage in stages] + ["Total (ms)", "Pareto"]
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    for row in sorted(rows, key=lambda r: (-r["accuracy"], r["latency"])):
+        cells = list(row["modes"].values()) + [f"{row['accuracy']:.3f}"]
+        cells += [f"{row['scores'][name]:.3f}" if name in row["scores"] else "-" for name in ("lc_info", "bol", "documents")]
+        cells += [f"{row['latencies'][stage] * 1000:.0f}" for stage in stages]
+        cells += [f"{row['latency'] * 1000:.0f}", "✅" if row["pareto"] else ""]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+def main():
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Accuracy-vs-latency benchmark of the pipeline modes.")
+    parser.add_argument("--corpus", type=Path, default=Config.EVALUATION_CORPUS, help="Labelled LC corpus folder")
+    parser.add_argument("--output", type=Path, help="Write the raw results to this JSON file")
+    args = parser.parse_args()
+
+    configure_logging(Config.LOG_FOLDER / "evaluation.log")
+    rows = run_evaluation(args.corpus)
+    print(format_table(rows))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
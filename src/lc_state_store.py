@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Set
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LCStateStore:
+    """
+    Persist the extraction state of each Letter of Credit, keyed by its
+    documentary credit number (field 21), so amended or re-uploaded LCs can be
+    re-extracted incrementally.
+    """
+
+    # Fields only found in an amendment (MT707): number and date of amendment
+    AMENDMENT_FIELDS = {"26E", "30"}
+    # Fields every full LC carries: an upload missing one of them only holds amended fields
+    FULL_LC_FIELDS = {"32B", "46A", "50", "59"}
+
+    def __init__(self, state_folder: Path = Config.LC_STATE_FOLDER):
+        """
+        Initialize the store.
+
+        Args:
+            state_folder (Path): Folder holding one JSON state file per LC
+        """
+        self.state_folder = Path(state_folder)
+        self.state_folder.mkdir(parents=True, exist_ok=True)
+
+    def _state_path(self, lc_number: str) -> Path:
+        safe_number = lc_number.replace("/", "_").replace("\\", "_").strip()
+        return self.state_folder / f"{safe_number}.json"
+
+    def load(self, lc_number: str) -> Optional[Dict]:
+        """
+        Load the stored state of an LC.
+
+        Args:
+            lc_number (str): Documentary credit number (field 21)
+
+        Returns:
+            Optional[Dict]: {"lc_info": ..., "results": ...} or None if unknown
+        """
+        state_path = self._state_path(lc_number)
+        if not state_path.exists():
+            return None
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading LC state {state_path}: {str(e)}")
+            return None
+
+    def save(self, lc_number: str, lc_info: Dict, results: Dict) -> None:
+        """
+        Store the state of an LC, replacing any previous one atomically.
+
+        Args:
+            lc_number (str): Documentary credit number (field 21)
+            lc_info (Dict): Per-field LC information
+            results (Dict): Extractor results
+        """
+        state_path = self._state_path(lc_number)
+        tmp_path = state_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"lc_info": lc_info, "results": results}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, state_path)
+        except Exception as e:
+            logger.error(f"Error saving LC state {state_path}: {str(e)}")
+
+    @classmethod
+    def is_amendment(cls, lc_info: Dict) -> bool:
+        """
+        Tell an amendment (to merge over the stored LC) from a full LC (replacing it).
+
+        Args:
+            lc_info (Dict): Extracted information of the uploaded LC
+
+        Returns:
+            bool: True if the upload carries amendment fields or only part of a full LC
+        """
+        return bool(cls.AMENDMENT_FIELDS & set(lc_info)) or not cls.FULL_LC_FIELDS <= set(lc_info)
+
+    @staticmethod
+    def diff_fields(old_lc_info: Dict, new_lc_info: Dict) -> Set[str]:
+        """
+        Compute which LC fields were added, removed or changed.
+
+        Args:
+            old_lc_info (Dict): Previously stored LC information
+            new_lc_info (Dict): Newly extracted LC information
+
+        Returns:
+            Set[str]: Codes of the fields whose value differs
+        """
+        codes = set(old_lc_info) | set(new_lc_info)
+        return {
+            code for code in codes
+            if old_lc_info.get(code, {}).get("value") != new_lc_info.get(code, {}).get("value")
+        }
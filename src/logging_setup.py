@@ -0,0 +1,141 @@
+"""
+Logging configuration shared by the API, the CLI and the benchmarks.
+
+Loggers only put records on an in-memory queue (QueueHandler); a background
+thread (QueueListener) formats them and writes them to the console and to a
+size-rotated file, so no request thread ever blocks on a disk write. File
+records are JSON lines carrying the id of the request that emitted them.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+from src.config import Config
+
+# Id of the request being handled by the current thread ("-" outside requests)
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+_listener: Optional[QueueListener] = None
+_listener_pid: Optional[int] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp each record with the current request id, in the emitting thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class TracebackQueueHandler(QueueHandler):
+    """
+    QueueHandler keeping the traceback apart from the message.
+
+    QueueHandler.prepare() merges the formatted traceback into the message and
+    drops exc_info/exc_text; here the traceback is kept in exc_text (a plain
+    string, safe to queue), so the file records carry it in "exception" and the
+    console formatter still prints it after the message.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None  # Tracebacks hold the frames alive: not queued
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(log_file: Path, level: int = logging.INFO, console: bool = True) -> None:
+    """
+    Route every log record through a queue to a background writer thread.
+
+    Safe to call again, e.g. in a forked worker to write to its own file: the
+    previous queue handler is replaced and a new writer thread is started.
+
+    Args:
+        log_file (Path): File receiving the JSON lines (rotated at Config.LOG_MAX_BYTES)
+        level (int): Root logger level
+        console (bool): Also write the records to stdout
+    """
+    global _listener, _listener_pid, _queue_handler
+
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+    if _listener is not None and _listener_pid == os.getpid():
+        _stop_listener()  # Flushes the pending records
+    # A listener inherited through fork has no thread in this process: dropped
+
+    log_file = Path(log_file)
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = RotatingFileHandler(log_file, maxBytes=Config.LOG_MAX_BYTES,
+                                       backupCount=Config.LOG_BACKUP_COUNT, encoding="utf-8")
+    file_handler.setFormatter(JSONFormatter())
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    record_queue = queue.SimpleQueue()
+    _queue_handler = TracebackQueueHandler(record_queue)
+    _queue_handler.addFilter(RequestIdFilter())
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(record_queue, *handlers)
+    _listener.start()
+    _listener_pid = os.getpid()
+
+
+def _stop_listener() -> None:
+    """Stop the writer thread once the queue is written, and close its files."""
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+
+
+def shutdown_logging() -> None:
+    """Write the queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _stop_listener()
+    _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -1,87 +1,260 @@
+import argparse
+import glob
+import hashlib
+import itertools
 import logging
+import os
+import contextvars
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 import json
 import sys
-from typing import Dict, Optional, Tuple
+import time
+from typing import Callable, Dict, List, Optional
 
+from src.circuit_breaker import llm_circuit_breaker
 from src.config import Config
+from src.logging_setup import configure_logging
 from src.preprocessor import TextPreprocessor
 from src.paragraph_matcher import ParagraphMatcher
+from src.lc_state_store import LCStateStore
+from src.models.llm_client import count_tokens
 from src.models.letter_of_credit_parser import LetterOfCreditParser
 from src.models.bill_of_lading_parser import BillOfLadingParser
 from src.models.verification_points_extractor import VerificationExtraction
 from src.models.required_documents_extractor import RequiredDocumentsExtractor
 
 from src.models.template_document_filler import DocumentFiller
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('../logs/extraction.log')
-    ]
-)
+from src.models.ooxml_renderer import OOXMLRenderer
 
 logger = logging.getLogger(__name__)
 
 
+class LCAnalysisContext:
+    """
+    Analysis state of one LC, shared by its extractions and the template filling.
+
+    The intermediate results (normalized field text, paragraph split, matched
+    paragraphs, prompt text, filling dictionary) are computed on first use and
+    memoized, so no stage repeats the work of another. Safe to use from the
+    extraction threads of pipelined mode.
+    """
+
+    def __init__(self, lc_info: Dict, matcher: ParagraphMatcher):
+        """
+        Args:
+            lc_info (Dict): Extracted LC information (may still be filled while parsing)
+            matcher (ParagraphMatcher): Matcher used to find the reference paragraphs
+        """
+        self.lc_info = lc_info
+        self.matcher = matcher
+        self.extractions: Dict = {}
+        # time.monotonic() value bounding the LLM calls of the extractions (None: unbounded)
+        self.deadline: Optional[float] = None
+        self._cache: Dict = {}
+        self._locks: Dict = {}
+        self._lock = threading.Lock()
+
+    def _memoize(self, key, compute: Callable):
+        """Compute a value once per context, even when several threads ask for it."""
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+        return self._cache[key]
+
+    def field_text(self, code: str) -> Optional[str]:
+        """Raw value of an LC field, None if the field is missing."""
+        field = self.lc_info.get(code)
+        return field['value'] if field else None
+
+    def normalized_text(self, code: str) -> str:
+        """Value of an LC field normalized by TextPreprocessor.preprocess_text."""
+        return self._memoize(("normalized", code), lambda: TextPreprocessor.preprocess_text(self.field_text(code)))
+
+    def paragraphs(self, code: str) -> List[str]:
+        """Paragraphs of the normalized value of an LC field."""
+        return self._memoize(("paragraphs", code),
+                             lambda: TextPreprocessor.separate_paragraphs(self.normalized_text(code)))
+
+    def similar_paragraphs(self, code: str, reference_paragraphs: List[str]) -> List[Dict]:
+        """Paragraphs of an LC field matched against reference paragraphs, most similar first."""
+        return self._memoize(("similar", code, tuple(reference_paragraphs)),
+                             lambda: self.matcher.find_similar_paragraphs(self.paragraphs(code), reference_paragraphs))
+
+    def prompt_text(self, code: str) -> str:
+        """Value of an LC field as put in the prompts (pruned in "pruned" prompt mode)."""
+        return self._memoize(("prompt", code), lambda: DocumentProcessor.prune_prompt_text(self.field_text(code)))
+
+    @property
+    def filling_dict(self) -> Dict:
+        """
+        Values filled in the templates, once the extractions are done.
+
+        Missing extractions are filled with Config.MISSING_SECTION_TEXT so the
+        documents are still produced, with the sections to complete flagged.
+        """
+        return self._memoize("filling_dict", self._build_filling_dict)
+
+    def _build_filling_dict(self) -> Dict:
+        result = self.extractions.get("BOL Extraction")
+        filling_list = LetterOfCreditParser.List_information_gen(self.lc_info)
+        if result:
+            filling_list.update(result)
+        else:
+            for field in DocumentProcessor.BOL_FIELDS:
+                filling_list.setdefault(field, Config.MISSING_SECTION_TEXT)
+        filling_list["Verification Points"] = self.extractions.get("Verification Points") or Config.MISSING_SECTION_TEXT
+        filling_list["Required Documents"] = self.extractions.get("Required Documents") or Config.MISSING_SECTION_TEXT
+        return filling_list
+
+
 class DocumentProcessor:
     """
     Main class for processing Letter of Credit and Bill of Lading documents.
     """
 
+    # LC field each extraction is computed from
+    EXTRACTION_SOURCES = {
+        "BOL Extraction": "46A",
+        "Required Documents": "46A",
+        "Verification Points": "47A",
+    }
+
+    # Bill of Lading template fields filled from the BOL extraction
+    BOL_FIELDS = [
+        "Number of Negotiable copies",
+        "Number of Non-Negotiable copies",
+        "Notify name and address",
+        "Consignee name and address",
+        "Freight payment type",
+    ]
+
     def __init__(self):
         """Initialize document processor with necessary extractors."""
-        self.lc_extractor = LCExtractor()
-        self.bol_extractor = BOLExtractor()
+        self.lc_extractor = LetterOfCreditParser()
+        self.bol_extractor = BillOfLadingParser()
         self.verification_extractor = VerificationExtraction()
-        self.documents_extractor = DocumentsExtractor()  # New Extractor
-        self.preprocessor = TextPreprocessor()
+        self.documents_extractor = RequiredDocumentsExtractor()  # New Extractor
+        # Reuse the LC parser's preprocessor so the spaCy model is loaded only once
+        self.preprocessor = self.lc_extractor.preprocessor
         self.matcher = ParagraphMatcher()
-
-    def process_letter_of_credit(self, file_path: Path) -> Optional[Dict]:
+        self.state_store = LCStateStore()
+        # Long-lived pool of the pipelined extractions: a request never waits for its
+        # shutdown, so an extraction past the deadline cannot hold the response back
+        self.extraction_executor = ThreadPoolExecutor(
+            max_workers=len(self.EXTRACTION_SOURCES) * Config.PIPELINE_CONCURRENCY,
+            thread_name_prefix="extraction")
+
+        # Keep the templates in memory (shared by forked workers in production)
+        DocumentFiller.preload_templates(Config.TEMPLATE_FILES.values())
+
+    @staticmethod
+    def read_letter_of_credit(file_path: Path) -> Optional[str]:
         """
-        Process a Letter of Credit document.
+        Read a Letter of Credit file.
 
         Args:
             file_path (Path): Path to the Letter of Credit file
 
         Returns:
-            Optional[Dict]: Extracted LC information or None if processing fails
+            Optional[str]: The LC text or None if it could not be read
         """
         try:
             with open(file_path, "r", encoding='utf-8') as file:
                 letter_of_credit = file.read()
-                logger.info(f"Successfully read Letter of Credit file: {file_path}")
-                return self.lc_extractor.extract_lc_info(letter_of_credit)
+            logger.info(f"Successfully read Letter of Credit file: {file_path}")
+            return letter_of_credit
         except FileNotFoundError:
             logger.error(f"Letter of Credit file not found at {file_path}")
         except Exception as e:
-            logger.error(f"Error processing Letter of Credit: {str(e)}")
+            logger.error(f"Error reading Letter of Credit: {str(e)}")
         return None
 
-    def process_bill_of_lading(self, bol_text: str) -> Optional[Dict]:
+    def create_context(self, lc_info: Dict) -> LCAnalysisContext:
+        """Create the analysis context of an LC."""
+        return LCAnalysisContext(lc_info, self.matcher)
+
+    def parse_and_extract(self, letter_of_credit: str,
+                          pipelined: Optional[bool] = None) -> Optional[LCAnalysisContext]:
         """
-        Process Bill of Lading text.
+        Parse a Letter of Credit and run its extractions.
+
+        With Config.PIPELINED_EXTRACTION, the LC is parsed incrementally and each
+        extraction is dispatched to a background thread as soon as its source
+        field (46A, 47A) is parsed, so the LLM calls overlap with the parsing of
+        the rest of the LC. Extractions whose stored result can be reused are not
+        dispatched.
 
         Args:
-            bol_text (str): Bill of Lading text to process
+            letter_of_credit (str): Letter of Credit text
+            pipelined (Optional[bool]): Overrides Config.PIPELINED_EXTRACTION (profiled
+                requests run sequentially, cProfile only sees the calling thread)
+
+        Returns:
+            Optional[LCAnalysisContext]: Context holding the merged LC information and
+            the extraction results, or None if the LC could not be parsed
+        """
+        if pipelined is None:
+            pipelined = Config.PIPELINED_EXTRACTION
+        if not pipelined:
+            try:
+                lc_info = self.lc_extractor.extract_lc_info(letter_of_credit)
+            except Exception as e:
+                logger.error(f"Error processing Letter of Credit: {str(e)}")
+                return None
+            if not lc_info:
+                return None
+            logger.info("Successfully processed Letter of Credit")
+            return self.process_extractions(self.create_context(lc_info))
+
+        context = self.create_context({})
+        prefetched = {}
+        previous = None
+        context.deadline = time.monotonic() + Config.EXTRACTION_DEADLINE
+        try:
+            for code, field in self.lc_extractor.iter_lc_info(letter_of_credit):
+                context.lc_info[code] = field
+                if code == '21' and field['value']:
+                    previous = self.state_store.load(field['value'])
+                for name, source_field in self.EXTRACTION_SOURCES.items():
+                    if source_field != code:
+                        continue
+                    if (previous and previous["results"].get(name)
+                            and previous["lc_info"].get(code, {}).get("value") == field["value"]):
+                        continue  # Stored result reusable, see process_extractions
+                    if llm_circuit_breaker.is_open():
+                        continue
+                    logger.info(f"Dispatching '{name}' while the LC is still being parsed")
+                    # Run in a copy of the context so the logs keep the request id
+                    prefetched[name] = self.extraction_executor.submit(
+                        contextvars.copy_context().run, self._run_extraction, name, context)
+        except Exception as e:
+            logger.error(f"Error processing Letter of Credit: {str(e)}")
+            self._abandon(prefetched)
+            return None
+
+        if not context.lc_info:
+            return None
+        logger.info("Successfully processed Letter of Credit")
+        return self.process_extractions(context, prefetched, context.deadline)
+
+    def process_bill_of_lading(self, context: LCAnalysisContext) -> Optional[Dict]:
+        """
+        Process the Bill of Lading clause of field 46A.
+
+        Args:
+            context (LCAnalysisContext): Analysis context of the LC
 
         Returns:
             Optional[Dict]: Extracted BOL information or None if processing fails
         """
         try:
-            # Preprocess the text
-            processed_text = self.preprocessor.preprocess_text(bol_text)
-            separated_paragraphs = self.preprocessor.separate_paragraphs(processed_text)
-
-            # Find similar paragraphs
-            similar_paragraphs = self.matcher.find_similar_paragraphs(
-                separated_paragraphs,
-                Config.BL_REFERENCE_PARAGRAPHS
-            )
+            # Find similar paragraphs in the preprocessed 46A text
+            similar_paragraphs = context.similar_paragraphs("46A", Config.BL_REFERENCE_PARAGRAPHS)
 
             if not similar_paragraphs:
                 logger.error("No similar paragraphs found in BOL text")
@@ -92,74 +265,222 @@ class DocumentProcessor:
             logger.info(f"Found matching paragraph with similarity score: {similar_paragraphs[0]['similarity_score']}")
 
             # Extract information from the matched paragraph
-            return self.bol_extractor.extract_information(input_text)
+            return self.bol_extractor.extract_information(self.prune_prompt_text(input_text), context.deadline)
 
         except Exception as e:
             logger.error(f"Error processing Bill of Lading: {str(e)}")
             return None
 
-    def process_verification_points(self, verification_text: str) -> Optional[str]:
+    def process_verification_points(self, context: LCAnalysisContext) -> Optional[str]:
         """
         Process verification points from LC text.
 
         Args:
-            verification_text (str): Letter of Credit text under field 47A.
+            context (LCAnalysisContext): Analysis context of the LC (field 47A is used)
 
         Returns:
             Optional[str]: Extracted verification points as bullet points.
         """
         try:
-            return self.verification_extractor.extract_verification_points(verification_text)
+            return self.verification_extractor.extract_verification_points(context.prompt_text("47A"), context.deadline)
         except Exception as e:
             logger.error(f"Error extracting verification points: {str(e)}")
             return None
 
-    def process_documents(self, documents_text: str) -> Optional[str]:
+    def process_documents(self, context: LCAnalysisContext) -> Optional[str]:
         """
         Process required documents from LC text.
 
         Args:
-            documents_text (str): Letter of Credit text under field 46A.
+            context (LCAnalysisContext): Analysis context of the LC (field 46A is used)
 
         Returns:
             Optional[str]: Extracted document list as bullet points.
         """
         try:
-            return self.documents_extractor.extract_documents(documents_text)
+            return self.documents_extractor.extract_documents(context.prompt_text("46A"), context.deadline)
         except Exception as e:
             logger.error(f"Error extracting required documents: {str(e)}")
             return None
 
 
-def process_and_fill_document(lc_info: Dict, result: Dict, verification_points: str, documents_list: str, filling_list: Dict) -> None:
+    @staticmethod
+    def prune_prompt_text(text: str) -> str:
+        """
+        In "pruned" prompt mode, drop repeated paragraphs and cap the text sent
+        to the LLM to Config.PRUNED_PROMPT_TOKENS.
+
+        Args:
+            text (str): LC field text
+
+        Returns:
+            str: The text to put in the prompt
+        """
+        if Config.PROMPT_MODE != "pruned":
+            return text
+
+        kept_paragraphs = []
+        budget = Config.PRUNED_PROMPT_TOKENS
+        for paragraph in dict.fromkeys(TextPreprocessor.separate_paragraphs(text)):
+            budget -= count_tokens(paragraph)
+            if budget < 0:
+                break
+            kept_paragraphs.append(paragraph)
+        return '\n'.join(kept_paragraphs)
+
+    def process_extractions(self, context: LCAnalysisContext, prefetched: Optional[Dict[str, Future]] = None,
+                            deadline: Optional[float] = None) -> LCAnalysisContext:
+        """
+        Run the extractions of an LC, reusing the stored results of a previous
+        upload of the same LC (field 21) for every extraction whose source
+        field did not change.
+
+        An amendment (MT707 fields, or only part of a full LC, see
+        LCStateStore.is_amendment) is merged over the stored LC: the fields it
+        does not carry are taken from there. Any other upload of the same LC is a
+        full replacement: fields it no longer has are dropped, and so are the
+        results extracted from them.
+
+        While the LLM circuit breaker is open, or once Config.EXTRACTION_DEADLINE
+        seconds are spent, the remaining extractions are skipped and left as None
+        (degraded mode). Only successful results are reused by later uploads.
+
+        Args:
+            context (LCAnalysisContext): Analysis context of the uploaded LC
+            prefetched (Optional[Dict[str, Future]]): Extractions already running on
+                this upload's fields (see parse_and_extract), by name
+            deadline (Optional[float]): time.monotonic() value by which the extractions
+                must be done (default: Config.EXTRACTION_DEADLINE seconds from now)
+
+        Returns:
+            LCAnalysisContext: The context, holding the merged LC information and the extraction results
+        """
+        prefetched = prefetched or {}
+        lc_info = context.lc_info
+        lc_number = lc_info.get('21', {}).get('value')
+        previous = self.state_store.load(lc_number) if lc_number else None
+
+        if previous:
+            amendment = LCStateStore.is_amendment(lc_info)
+            merged_lc_info = {**previous["lc_info"], **lc_info} if amendment else lc_info
+            changed_fields = LCStateStore.diff_fields(previous["lc_info"], merged_lc_info)
+            # Removed source fields are changed fields too: their results are not reused
+            results = dict(previous["results"])
+            logger.info(f"LC {lc_number} already processed ({'amendment' if amendment else 'full re-upload'}), "
+                        f"changed fields: {sorted(changed_fields)}")
+        else:
+            merged_lc_info = lc_info
+            changed_fields = set(lc_info)
+            results = {}
+
+        # Fields of the upload keep their value: what the context already computed stays valid
+        context.lc_info = merged_lc_info
+        if deadline is None:
+            deadline = time.monotonic() + Config.EXTRACTION_DEADLINE
+        context.deadline = deadline  # Also bounds each LLM call, retries included
+        for name, source_field in self.EXTRACTION_SOURCES.items():
+            if results.get(name) and source_field not in changed_fields:
+                logger.info(f"Reusing stored '{name}' ({source_field} unchanged)")
+                continue
+            if name in prefetched:
+                try:
+                    results[name] = prefetched[name].result(timeout=max(deadline - time.monotonic(), 0))
+                except FutureTimeoutError:
+                    # Not waited for: it finishes (or is dropped, if not started) in the background
+                    prefetched[name].cancel()
+                    logger.warning(f"Extraction deadline exceeded, '{name}' left missing")
+                    results[name] = None
+                except Exception as e:
+                    logger.error(f"Error in '{name}' extraction: {str(e)}")
+                    results[name] = None
+            elif llm_circuit_breaker.is_open():
+                logger.warning(f"LLM circuit open, skipping '{name}'")
+                results[name] = None
+            elif time.monotonic() >= deadline:
+                logger.warning(f"Extraction deadline exceeded, skipping '{name}'")
+                results[name] = None
+            else:
+                results[name] = self._run_extraction(name, context)
+
+        if lc_number:
+            self.state_store.save(lc_number, merged_lc_info, results)
+
+        context.extractions = results
+        return context
+
+    @staticmethod
+    def _abandon(prefetched: Dict[str, Future]) -> None:
+        """Cancel the prefetched extractions that have not started yet."""
+        for future in prefetched.values():
+            future.cancel()
+
+    def _run_extraction(self, name: str, context: LCAnalysisContext):
+        """
+        Run a single extraction on its source field.
+
+        Args:
+            name (str): Extraction name (key of EXTRACTION_SOURCES)
+            context (LCAnalysisContext): Analysis context of the LC
+
+        Returns:
+            The extraction result, or None if it failed or the field is missing
+        """
+        source_field = self.EXTRACTION_SOURCES[name]
+        if source_field not in context.lc_info:
+            logger.error(f"No '{source_field}' field found in Letter of Credit")
+            return None
+
+        if name == "BOL Extraction":
+            result = self.process_bill_of_lading(context)
+            if result:
+                result['Notify name and address'] = result.pop(
+                    'Notify name and address (or blank endorsed)', None)
+        elif name == "Required Documents":
+            result = self.process_documents(context)
+        else:
+            result = self.process_verification_points(context)
+
+        if result:
+            logger.info(f"Successfully extracted {name}")
+        else:
+            logger.error(f"Failed to extract {name}")
+        return result
+
+    @staticmethod
+    def missing_sections(extractions: Dict) -> List[str]:
+        """
+        List the extractions that produced nothing (failed or skipped in degraded mode).
+
+        Args:
+            extractions (Dict): Extraction results, by name
+
+        Returns:
+            List[str]: Names of the missing extractions
+        """
+        return [name for name, value in extractions.items() if not value]
+
+
+def process_and_fill_document(context: LCAnalysisContext, output_files: Optional[Dict[str, Path]] = None) -> None:
     """
-    Process the document filling with extracted information.
+    Fill and save one document per template from the filling dictionary of an LC.
 
     Args:
-        lc_info (Dict): Extracted LC information
-        result (Dict): BOL processing result
-        verification_points (str): Extracted verification points
-        documents_list (str): Extracted required documents list
-        filling_list (Dict): Combined information for filling
+        context (LCAnalysisContext): Analysis context of the LC, with its extractions done
+        output_files (Optional[Dict[str, Path]]): Output path per template (default: Config.OUTPUT_FILES)
     """
+    output_files = output_files or Config.OUTPUT_FILES
     try:
-        # Add verification points and document list to filling list
-        filling_list["Verification Points"] = verification_points
-        filling_list["Required Documents"] = documents_list
-
-        # Initialize document fillers for two templates
-        document_filler1 = DocumentFiller(Config.TEMPLATE_FILE1)
-        document_filler2 = DocumentFiller(Config.TEMPLATE_FILE2)
-        document_filler3 = DocumentFiller(Config.TEMPLATE_FILE3)
+        # Computed once, read by every template
+        filling_list = context.filling_dict
 
-        # Fill and save documents
-        document_filler1.fill_document(filling_list)
-        document_filler2.fill_document(filling_list)
-        document_filler3.fill_document(filling_list)
-
-        document_filler1.save_document(Config.OUTPUT_FILE1, filling_list)
-        document_filler2.save_document(Config.OUTPUT_FILE2, filling_list)
-        document_filler3.save_document(Config.OUTPUT_FILE3, filling_list)
+        # Fill and save one document per template
+        for name, template_path in Config.TEMPLATE_FILES.items():
+            if name in Config.OOXML_TEMPLATES:
+                document_filler = OOXMLRenderer(template_path)
+            else:
+                document_filler = DocumentFiller(template_path)
+            document_filler.fill_document(filling_list)
+            document_filler.save_document(output_files[name], filling_list)
 
         logger.info("Document filling completed successfully")
 
@@ -168,67 +489,217 @@ def process_and_fill_document(lc_info: Dict, result: Dict, verification_points:
         raise
 
 
-def main():
-    """Main function to run the document processing pipeline."""
-    try:
-        logger.info("Starting document processing")
+def process_lc_file(processor: DocumentProcessor, file_path: Path,
+                    output_files: Optional[Dict[str, Path]] = None) -> Optional[Dict]:
+    """
+    Run the whole pipeline on one Letter of Credit file: extraction, then filling of every template.
 
-        # Initialize document processor
-        processor = DocumentProcessor()
+    Args:
+        processor (DocumentProcessor): Document processor
+        file_path (Path): Path to the Letter of Credit file
+        output_files (Optional[Dict[str, Path]]): Output path per template (default: Config.OUTPUT_FILES)
 
-        # Process Letter of Credit
-        lc_info = processor.process_letter_of_credit(Config.LETTER_OF_CREDIT_FILE)
-        if not lc_info:
-            logger.error("Failed to process Letter of Credit")
-            return
+    Returns:
+        Optional[Dict]: Extraction results and filled data, or None if the LC could not be parsed
+    """
+    letter_of_credit = processor.read_letter_of_credit(file_path)
+    if letter_of_credit is None:
+        return None
 
-        logger.info("Successfully processed Letter of Credit")
+    # Parse the LC and run the extractions (incrementally for already processed LCs)
+    context = processor.parse_and_extract(letter_of_credit)
+    if context is None:
+        logger.error("Failed to process Letter of Credit")
+        return None
 
-        # Generate filling dictionary
-        filling_list = LCExtractor.List_information_gen(lc_info)
+    # Process document filling
+    process_and_fill_document(context, output_files)
 
-        # Process Bill of Lading if '46A' field exists
-        result = None
-        documents_list = None
-        if '46A' in lc_info:
-            bol_text = lc_info['46A']['value']
-            result = processor.process_bill_of_lading(bol_text)
-            documents_list = processor.process_documents(bol_text)  # Extract documents
+    return {
+        "BOL Extraction": context.extractions["BOL Extraction"],
+        "Verification Points": context.extractions["Verification Points"],
+        "Required Documents": context.extractions["Required Documents"],
+        "Missing Sections": DocumentProcessor.missing_sections(context.extractions),
+        "Filled Document Data": context.filling_dict
+    }
+
+
+# Document processor of a batch worker process, created once by _init_batch_worker
+_batch_processor: Optional[DocumentProcessor] = None
 
-            if result:
-                result['Notify name and address'] = result.pop(
-                    'Notify name and address (or blank endorsed)', None)
-                logger.info("Successfully extracted BOL information")
-                for key, value in result.items():
-                    filling_list[key] = value
-            else:
-                logger.error("Failed to extract BOL information")
 
+def _init_batch_worker() -> None:
+    global _batch_processor
+    # The parent's log writer thread does not exist in this process: start our own
+    configure_logging(Config.LOG_FOLDER / f"batch.{os.getpid()}.log", console=False)
+    # Batch outputs are plain files in the per-LC folders: the delta store keys its
+    # documents by file name only and would mix up the LCs of a batch
+    Config.ARTIFACT_STORAGE = "full"
+    _batch_processor = DocumentProcessor()
+
+
+def _process_batch_file(file_path: str, output_name: str, output_folder: str) -> Dict:
+    """Process one LC of a batch into its own output folder and describe the outcome for the manifest."""
+    started_at = time.perf_counter()
+    lc_output_folder = Path(output_folder) / output_name
+    output_files = {name: lc_output_folder / Path(path).name for name, path in Config.OUTPUT_FILES.items()}
+    entry = {"file": file_path}
+    try:
+        lc_output_folder.mkdir(parents=True, exist_ok=True)
+        final_output = process_lc_file(_batch_processor, Path(file_path), output_files)
+        if final_output is None:
+            entry.update(status="failed", error="Unable to extract information from the Letter of Credit")
         else:
-            logger.error("No '46A' field found in Letter of Credit")
-
-        # Process Verification Extraction if '47A' field exists
-        verification_points = None
-        if '47A' in lc_info:
-            verification_text = lc_info['47A']['value']
-            verification_points = processor.process_verification_points(verification_text)
-            if verification_points:
-                logger.info("Successfully extracted verification points")
-            else:
-                logger.error("Failed to extract verification points")
+            doc_number = final_output["Filled Document Data"].get("21", "UNKNOWN")
+            with open(lc_output_folder / "extraction.json", "w", encoding="utf-8") as f:
+                json.dump(final_output, f, ensure_ascii=False, indent=2)
+            entry.update(
+                status="degraded" if final_output["Missing Sections"] else "ok",
+                lc_number=doc_number,
+                missing_sections=final_output["Missing Sections"],
+                outputs=[str(DocumentFiller.output_path_for(path, doc_number)) for path in output_files.values()]
+            )
+    except Exception as e:
+        logger.error(f"Error processing {file_path}: {str(e)}")
+        entry.update(status="failed", error=str(e))
+    entry["seconds"] = round(time.perf_counter() - started_at, 3)
+    return entry
+
+
+def _collect_lc_files(inputs: List[str]) -> Dict[str, str]:
+    """
+    Expand directories (their *.txt files) and glob patterns into the LC files to process.
+
+    Returns:
+        Dict[str, str]: Output folder name of each LC file, by resolved path (sorted). The
+        name is the file path relative to its input directory (or to the fixed part of
+        its glob pattern) without extension, suffixed with a hash of the full path if
+        two LC files of the batch would share it.
+    """
+    relative_paths = {}
+    for pattern in inputs:
+        if Path(pattern).is_dir():
+            root = Path(pattern)
+            paths = root.glob("*.txt")
         else:
-            logger.error("No '47A' field found in Letter of Credit")
+            fixed_parts = itertools.takewhile(lambda part: not glob.has_magic(part), Path(pattern).parts[:-1])
+            root = Path(*fixed_parts)
+            paths = (Path(path) for path in glob.glob(pattern, recursive=True) if Path(path).is_file())
+        for path in paths:
+            try:
+                relative_paths.setdefault(str(path.resolve()), path.relative_to(root))
+            except ValueError:
+                relative_paths.setdefault(str(path.resolve()), Path(path.name))
+
+    names = {}
+    for file_path in sorted(relative_paths):
+        names.setdefault(relative_paths[file_path].with_suffix("").as_posix(), []).append(file_path)
+    output_names = {}
+    for name, file_paths in names.items():
+        for file_path in file_paths:
+            output_names[file_path] = (name if len(file_paths) == 1
+                                       else f"{name}_{hashlib.sha256(file_path.encode()).hexdigest()[:8]}")
+    return dict(sorted(output_names.items()))
+
+
+def run_batch(inputs: List[str], output_folder: Path, workers: int, manifest_path: Path,
+              checkpoint_path: Path) -> Dict[str, int]:
+    """
+    Process many LC files across a process pool, resumably.
 
-        # Process document filling
-        process_and_fill_document(lc_info, result, verification_points, documents_list, filling_list)
+    Every processed LC gets its documents and an extraction.json in its own
+    folder (named after the LC file path, see _collect_lc_files) and a line in
+    the JSONL manifest. The documents are always stored in full there. LCs
+    processed successfully (status "ok" or "degraded") are appended to the
+    checkpoint file, and skipped when an interrupted run is started again.
+
+    Args:
+        inputs (List[str]): Directories and/or glob patterns of LC files
+        output_folder (Path): Folder receiving one sub-folder per LC
+        workers (int): Number of worker processes
+        manifest_path (Path): JSONL manifest, appended to
+        checkpoint_path (Path): File listing the LCs already processed
+
+    Returns:
+        Dict[str, int]: Number of LCs per status
+    """
+    files = _collect_lc_files(inputs)
+    done = set()
+    if checkpoint_path.exists():
+        done = set(checkpoint_path.read_text(encoding="utf-8").splitlines())
+    pending = [file_path for file_path in files if file_path not in done]
+    logger.info(f"Batch: {len(files)} LC files, {len(files) - len(pending)} already processed, {len(pending)} to go")
+
+    output_folder.mkdir(parents=True, exist_ok=True)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+
+    counts = {"ok": 0, "degraded": 0, "failed": 0}
+    started_at = time.monotonic()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker) as executor, \
+            open(manifest_path, "a", encoding="utf-8") as manifest, \
+            open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        queued = iter(pending)
+        in_flight = set()
+        completed = 0
+        while True:
+            # Bounded submission: a 50k-file batch never holds 50k futures
+            for file_path in itertools.islice(queued, workers * 2 - len(in_flight)):
+                in_flight.add(executor.submit(_process_batch_file, file_path, files[file_path], str(output_folder)))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                entry = future.result()
+                counts[entry["status"]] += 1
+                manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                manifest.flush()
+                if entry["status"] != "failed":
+                    checkpoint.write(entry["file"] + "\n")
+                    checkpoint.flush()
+                completed += 1
+
+            elapsed = time.monotonic() - started_at
+            throughput = completed / elapsed if elapsed else 0.0
+            eta = (len(pending) - completed) / throughput if throughput else 0.0
+            print(f"\r[{completed}/{len(pending)}] {throughput:.2f} LC/s, ETA {int(eta // 60)}m{int(eta % 60):02d}s "
+                  f"(ok {counts['ok']}, degraded {counts['degraded']}, failed {counts['failed']})",
+                  end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+
+    logger.info(f"Batch finished in {time.monotonic() - started_at:.1f}s: {counts}")
+    return counts
+
+
+def main():
+    """Main function to run the document processing pipeline."""
+    parser = argparse.ArgumentParser(description="Process Letters of Credit and fill the document templates.")
+    parser.add_argument("inputs", nargs="*",
+                        help="Batch mode: directories and/or glob patterns of LC files (default: Config.LETTER_OF_CREDIT_FILE)")
+    parser.add_argument("--workers", type=int, default=Config.BATCH_WORKERS, help="Batch worker processes")
+    parser.add_argument("--output", type=Path, default=Config.BATCH_OUTPUT_FOLDER, help="Batch output folder")
+    parser.add_argument("--manifest", type=Path, help="JSONL manifest (default: <output>/manifest.jsonl)")
+    parser.add_argument("--checkpoint", type=Path, help="Checkpoint file (default: <output>/checkpoint.txt)")
+    args = parser.parse_args()
+
+    configure_logging(Config.LOG_FOLDER / "extraction.log")
+    try:
+        if args.inputs:
+            run_batch(args.inputs, args.output, args.workers,
+                      args.manifest or args.output / "manifest.jsonl",
+                      args.checkpoint or args.output / "checkpoint.txt")
+            return
+
+        logger.info("Starting document processing")
+
+        # Initialize document processor
+        processor = DocumentProcessor()
+
+        final_output = process_lc_file(processor, Config.LETTER_OF_CREDIT_FILE)
+        if final_output is None:
+            return
 
         # Print extraction results
-        final_output = {
-            "BOL Extraction": result,
-            "Verification Points": verification_points,
-            "Required Documents": documents_list,
-            "Filled Document Data": filling_list
-        }
         print(final_output)
 
     except Exception as e:
@@ -237,4 +708,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,5 +3,6 @@ from .bill_of_lading_parser import BillOfLadingParser
 from .required_documents_extractor import RequiredDocumentsExtractor
 from .verification_points_extractor import VerificationExtraction
 from .template_document_filler import DocumentFiller
+from .ooxml_renderer import OOXMLRenderer
 
-__all__ = ['LetterOfCreditParser', 'BillOfLadingParser', 'RequiredDocumentsExtractor', 'VerificationExtraction', 'DocumentFiller']
+__all__ = ['LetterOfCreditParser', 'BillOfLadingParser', 'RequiredDocumentsExtractor', 'VerificationExtraction', 'DocumentFiller', 'OOXMLRenderer']
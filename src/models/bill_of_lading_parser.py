@@ -3,6 +3,8 @@ import logging
 import json
 from typing import Dict, Optional
 from src.config import Config
+from src.models.llm_client import JSONObjectTerminator
+from src.models.prompt_builder import ExampleIndex, PromptBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -15,21 +17,11 @@ class BillOfLadingParser:
     def __init__(self):
         """Initialize the BOLExtractor with API key."""
         openai.api_key = Config.OPENAI_API_KEY  # Ensure this is set in your config
-
-    def extract_information(self, paragraph: str) -> Dict[str, Optional[str]]:
-        """
-        Extracts required information from a given Bill of Lading paragraph.
-
-        Args:
-            paragraph (str): The paragraph containing the Bill of Lading information.
-
-        Returns:
-            Dict[str, Optional[str]]: Extracted structured information.
-        """
-        prompt = (
-            "Extract the required information from the following paragraph and return only a valid JSON object. "
+        self.prompt_builder = PromptBuilder(
+            "bill_of_lading",
+            "You are an assistant for structured information extraction.",
+            "Extract the required information from the paragraph below and return only a valid JSON object. "
             "Do not include any explanations or extra text. The response must strictly follow this format:\n\n"
-            f"Paragraph:\n{paragraph}\n\n"
             "Expected JSON structure:\n"
             "```\n"
             "{\n"
@@ -40,20 +32,31 @@ class BillOfLadingParser:
             '  "Freight payment type": "value"\n'
             "}\n"
             "```\n"
-            "Return only valid JSON, without any extra text or explanations."
+            "Return only valid JSON, without any extra text or explanations.",
+            "Paragraph",
+            examples=ExampleIndex(Config.EXAMPLES_FILE)
         )
 
+    def extract_information(self, paragraph: str, deadline: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """
+        Extracts required information from a given Bill of Lading paragraph.
+
+        Args:
+            paragraph (str): The paragraph containing the Bill of Lading information.
+            deadline (Optional[float]): time.monotonic() value by which the LLM call must be done.
+
+        Returns:
+            Dict[str, Optional[str]]: Extracted structured information.
+        """
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "system", "content": "You are an assistant for structured information extraction."},
-                          {"role": "user", "content": prompt}],
-                max_tokens=200
+            # Rate limited, streamed call (cancelled once the JSON object is complete)
+            extracted_data = self.prompt_builder.complete(
+                paragraph,
+                max_tokens=200,
+                terminator=JSONObjectTerminator(),
+                deadline=deadline
             )
 
-            # Extract and clean the JSON response
-            extracted_data = response["choices"][0]["message"]["content"].strip()
-
             # Ensure JSON output by cleaning extra text
             extracted_data = self._extract_json_from_text(extracted_data)
 
@@ -1,10 +1,13 @@
 import json, re
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 from src.preprocessor import TextPreprocessor
 from src.config import Config
 
 list_codes = ["59", "50", "44E", "44F", "45A", "20", "21", "31C"]
 
+# Start of a field in regex mode, e.g. ":46A:" or "46A :" at the beginning of a line
+FIELD_PATTERN = re.compile(r'(?m)^\s*:?(\d{2}[A-Z]?)\s*:')
+
 class LetterOfCreditParser:
     def __init__(self):
         self.preprocessor = TextPreprocessor()
@@ -20,9 +23,87 @@ class LetterOfCreditParser:
             return {}
 
     def extract_lc_info(self, text: str) -> Dict[str, dict]:
+        if Config.LC_PARSER_MODE == "regex":
+            return self._extract_with_regex(text)
         tokens = self.preprocessor.preprocess_with_spacy(text)
         return self._extract_from_tokens(tokens)
 
+    def iter_lc_info(self, text: str) -> Iterator[Tuple[str, dict]]:
+        """
+        Parse the LC incrementally, yielding each field as soon as its end is known.
+
+        In spaCy mode the text is tokenized block by block, each block starting
+        at a line opening a field, so the fields at the top of the LC are emitted
+        before the rest is tokenized. The fields are the same as extract_lc_info's.
+
+        Args:
+            text (str): Letter of Credit text
+
+        Yields:
+            Tuple[str, dict]: Field code and {"description", "value"}
+        """
+        if Config.LC_PARSER_MODE == "regex":
+            matches = (m for m in FIELD_PATTERN.finditer(text) if m.group(1) in self.lc_codes)
+            match = next(matches, None)
+            while match is not None:
+                next_match = next(matches, None)
+                end = next_match.start() if next_match else len(text)
+                yield match.group(1), {
+                    "description": self.lc_codes.get(match.group(1), ""),
+                    "value": ' '.join(text[match.end():end].split())
+                }
+                match = next_match
+            return
+
+        tokens = []
+        code, value_start = None, 0
+        i = 0
+        blocks = self._field_blocks(text)
+        block = next(blocks, None)
+        while block is not None:
+            # Lines are tokenized separately anyway ("\n" is a token), so tokenizing
+            # block by block gives the same tokens as the whole text at once
+            tokens.extend(self.preprocessor.preprocess_with_spacy(block))
+            block = next(blocks, None)
+            # Keep one token of lookahead (the ":" after a code) until the last block
+            scan_end = len(tokens) if block is None else len(tokens) - 1
+            while i < scan_end:
+                if self._is_valid_code(tokens, i):
+                    if code is not None:
+                        yield code, {"description": self.lc_codes.get(code, ""),
+                                     "value": self._format_value(tokens[value_start:i])}
+                    code, value_start = tokens[i], i + 2
+                    i += 2
+                else:
+                    i += 1
+        if code is not None:
+            yield code, {"description": self.lc_codes.get(code, ""),
+                         "value": self._format_value(tokens[value_start:])}
+
+    @staticmethod
+    def _field_blocks(text: str) -> Iterator[str]:
+        """Split the text before every line that opens a field."""
+        start = 0
+        for match in FIELD_PATTERN.finditer(text):
+            if match.start() > start:
+                yield text[start:match.start()]
+                start = match.start()
+        if start < len(text):
+            yield text[start:]
+
+    def _extract_with_regex(self, text: str) -> Dict[str, dict]:
+        """Lighter parser: fields start a line as "46A:" or ":46A:", no spaCy tokenization."""
+        extracted_info = {}
+        matches = [m for m in FIELD_PATTERN.finditer(text) if m.group(1) in self.lc_codes]
+        for match, next_match in zip(matches, matches[1:] + [None]):
+            code = match.group(1)
+            end = next_match.start() if next_match else len(text)
+            extracted_info[code] = {
+                "description": self.lc_codes.get(code, ""),
+                "value": ' '.join(text[match.end():end].split())
+            }
+        return extracted_info
+
     def _extract_from_tokens(self, tokens: List[str]) -> Dict[str, dict]:
         extracted_info = {}
         i = 0
@@ -62,10 +143,14 @@ class LetterOfCreditParser:
             value_tokens.append(tokens[i])
             i += 1
 
+        return self._format_value(value_tokens), i
+
+    @staticmethod
+    def _format_value(value_tokens: List[str]) -> str:
         value = ' '.join(value_tokens).strip()
         if value.endswith(':'):
             value = value[:-1]
-        return value.strip(), i
+        return value.strip()
 
     import re
 
@@ -88,11 +173,9 @@ class LetterOfCreditParser:
 
         for code in text_to_remove:
             try:
+                # Values are already whitespace-normalized by the parser (both modes)
                 text = lc_dict[code]['value']
 
-                # Normalize spaces before processing
-                text = re.sub(r"\s+", " ", text).strip()  # Remove extra spaces
-
                 # Remove unnecessary labels
                 text = re.sub(text_to_remove[code], '', text, flags=re.IGNORECASE).strip()
 
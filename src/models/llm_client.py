@@ -0,0 +1,275 @@
+import logging
+import re
+import time
+import openai
+from typing import Dict, Iterable, List, Optional
+from src.circuit_breaker import CircuitOpenError, llm_circuit_breaker
+from src.config import Config
+from src.rate_limiter import llm_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Start of a bullet-list item: "- ", "* ", "• " or "1. "
+BULLET_PATTERN = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s')
+
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o family
+except Exception:  # tiktoken missing or encoding not downloadable
+    _encoding = None
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call cannot complete before the caller's deadline."""
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a text locally, with tiktoken when available and
+    about 4 characters per token otherwise.
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut a text to at most `max_tokens` tokens (as counted by count_tokens).
+
+    Args:
+        text (str): Text to cut
+        max_tokens (int): Maximum number of tokens kept
+
+    Returns:
+        str: The text, or its beginning if it was longer
+    """
+    max_tokens = max(max_tokens, 0)
+    if _encoding is not None:
+        tokens = _encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else _encoding.decode(tokens[:max_tokens])
+    return text[:max(max_tokens - 1, 0) * 4]
+
+
+class StreamTerminator:
+    """
+    Incrementally inspects a streamed completion and decides when the rest of
+    it is no longer needed.
+    """
+
+    def __init__(self):
+        self.text = ""
+
+    def feed(self, piece: str) -> bool:
+        """
+        Consume the next piece of the completion.
+
+        Args:
+            piece (str): Newly received text
+
+        Returns:
+            bool: True once enough text has been received
+        """
+        self.text += piece
+        return False
+
+    def result(self) -> str:
+        """Return the useful part of the text received so far."""
+        return self.text.strip()
+
+
+class JSONObjectTerminator(StreamTerminator):
+    """Stops as soon as the first top-level JSON object is closed."""
+
+    def __init__(self):
+        super().__init__()
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.start = None
+        self.end = None
+
+    def feed(self, piece: str) -> bool:
+        self.text += piece
+        while self.position < len(self.text):
+            char = self.text[self.position]
+            self.position += 1
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"' and self.depth > 0:
+                self.in_string = True
+            elif char == "{":
+                if self.depth == 0:
+                    self.start = self.position - 1
+                self.depth += 1
+            elif char == "}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = self.position
+                    return True
+        return False
+
+    def result(self) -> str:
+        if self.start is not None and self.end is not None:
+            return self.text[self.start:self.end]
+        return super().result()
+
+
+class BulletListTerminator(StreamTerminator):
+    """Stops once a bullet list reaches a maximum number of items."""
+
+    # Characters after which an incomplete line not starting with an item marker is not an item
+    LOOKAHEAD = 8
+
+    def __init__(self, max_items: int):
+        super().__init__()
+        self.max_items = max_items
+        self.items = 0
+        self.line_start = 0
+        self.line_checked = False
+        self.end = None
+
+    def feed(self, piece: str) -> bool:
+        self.text += piece
+        while True:
+            newline = self.text.find("\n", self.line_start)
+            line_end = newline if newline != -1 else len(self.text)
+
+            if not self.line_checked:
+                # An item is recognized as soon as its marker is complete, even on a last line
+                # without newline; a line is given up once complete or LOOKAHEAD characters long
+                is_item = BULLET_PATTERN.match(self.text[self.line_start:line_end]) is not None
+                if is_item or newline != -1 or line_end - self.line_start >= self.LOOKAHEAD:
+                    self.line_checked = True
+                    if is_item:
+                        if self.items == self.max_items:
+                            # One item too many: drop it and everything after
+                            self.end = self.line_start
+                            return True
+                        self.items += 1
+
+            if newline == -1:
+                return False
+            self.line_start = newline + 1
+            self.line_checked = False
+
+    def result(self) -> str:
+        text = self.text[:self.end] if self.end is not None else self.text
+        return text.strip()
+
+
+def consume_stream(chunks: Iterable[Dict], terminator: StreamTerminator, deadline: Optional[float] = None) -> str:
+    """
+    Read a streamed chat completion until the terminator is satisfied, then
+    close the stream so the remaining tokens are not generated nor billed.
+
+    Args:
+        chunks (Iterable[Dict]): Streamed completion chunks (OpenAI format)
+        terminator (StreamTerminator): Decides when to stop reading
+        deadline (Optional[float]): time.monotonic() value after which reading stops
+
+    Returns:
+        str: The useful part of the completion
+
+    Raises:
+        DeadlineExceeded: If the deadline passes before the terminator is satisfied
+    """
+    try:
+        for chunk in chunks:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DeadlineExceeded("Deadline exceeded while reading the completion")
+            piece = chunk["choices"][0].get("delta", {}).get("content")
+            if piece and terminator.feed(piece):
+                logger.info("Stopped reading the completion early")
+                break
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+    return terminator.result()
+
+
+def chat_completion(messages: List[Dict[str, str]], max_tokens: int, model: str = "gpt-4o-mini",
+                    terminator: Optional[StreamTerminator] = None, deadline: Optional[float] = None) -> str:
+    """
+    Call the chat completion API within the shared requests/tokens per minute limits,
+    behind the LLM circuit breaker. Each call is bounded by LLM_REQUEST_TIMEOUT and,
+    with a deadline, the rate limiter wait, the request timeout and the retries are
+    all bounded by the time left.
+
+    Args:
+        messages (List[Dict[str, str]]): Chat messages
+        max_tokens (int): Maximum completion tokens
+        model (str): Model name
+        terminator (Optional[StreamTerminator]): If set, the completion is cut where the
+            terminator is satisfied; with LLM_STREAMING it is streamed and cancelled there
+        deadline (Optional[float]): time.monotonic() value by which the call must be done
+
+    Returns:
+        str: The completion text, stripped
+
+    Raises:
+        RateLimitExceeded: If no capacity was available in time
+        CircuitOpenError: If the circuit breaker refuses the call
+        DeadlineExceeded: If the deadline passes before a completion is received
+    """
+    estimated_tokens = sum(count_tokens(message["content"]) for message in messages) + max_tokens
+    stream = terminator is not None and Config.LLM_STREAMING
+
+    for attempt in range(Config.LLM_MAX_RETRIES + 1):
+        remaining = deadline - time.monotonic() if deadline is not None else None
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("Deadline exceeded before the LLM call")
+        if not llm_circuit_breaker.allow_request():
+            raise CircuitOpenError("LLM circuit is open")
+        try:
+            llm_rate_limiter.acquire(estimated_tokens, timeout=remaining)
+        except Exception:
+            llm_circuit_breaker.release()  # The provider was not called
+            raise
+
+        request_timeout = Config.LLM_REQUEST_TIMEOUT
+        if deadline is not None:
+            request_timeout = min(request_timeout, max(deadline - time.monotonic(), 0.1))
+        started_at = time.perf_counter()
+        try:
+            response = openai.ChatCompletion.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                stream=stream,
+                request_timeout=request_timeout
+            )
+            if stream:
+                content = consume_stream(response, terminator, deadline)
+            else:
+                content = response["choices"][0]["message"]["content"].strip()
+                if terminator is not None:
+                    # Same cut as a streamed completion (first JSON object, max list items)
+                    terminator.feed(content)
+                    content = terminator.result()
+        except Exception as e:
+            cut_short = request_timeout < Config.LLM_REQUEST_TIMEOUT and isinstance(
+                e, (openai.error.Timeout, DeadlineExceeded))
+            if cut_short:
+                # Stopped by the caller's deadline, not a provider failure
+                llm_circuit_breaker.release()
+            else:
+                llm_circuit_breaker.record(False, time.perf_counter() - started_at)
+            if not isinstance(e, openai.error.RateLimitError) or attempt == Config.LLM_MAX_RETRIES:
+                raise
+            backoff = 2 ** attempt
+            if deadline is not None and time.monotonic() + backoff >= deadline:
+                raise DeadlineExceeded("Deadline exceeded, provider rate limit not retried") from e
+            logger.warning(f"Provider rate limit hit, retrying in {backoff}s")
+            time.sleep(backoff)
+            continue
+        llm_circuit_breaker.record(True, time.perf_counter() - started_at)
+        return content
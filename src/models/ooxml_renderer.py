@@ -0,0 +1,219 @@
+import logging
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List
+from lxml import etree
+from src.models.template_document_filler import (DocumentFiller, substitute_placeholders,
+                                                  write_document_bytes)
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_PART = "word/document.xml"
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def _w(tag: str) -> str:
+    return f"{{{W}}}{tag}"
+
+
+# rPr children copied to the new run, in schema order (as python-docx inserts them)
+_RPR_ORDER = ["rFonts", "b", "i", "color", "sz", "u"]
+
+
+class OOXMLRenderer:
+    """
+    Fills a Word template by rewriting only word/document.xml in the zip,
+    without building the python-docx object model. Every other zip member is
+    copied through unchanged.
+
+    Paragraphs are handled exactly like DocumentFiller does: placeholders may be
+    split across runs, and a modified paragraph gets its runs emptied and a new
+    run holding the whole text, with the formatting of its last run.
+    """
+
+    def __init__(self, template_path: Path):
+        """
+        Initialize the renderer with a template path.
+
+        Args:
+            template_path (Path): Path to the Word template document
+        """
+        self.template_path = template_path
+        try:
+            self.template_bytes = DocumentFiller._template_cache.get(Path(template_path))
+            if self.template_bytes is None:
+                self.template_bytes = Path(template_path).read_bytes()
+            with zipfile.ZipFile(BytesIO(self.template_bytes)) as archive:
+                self.document_xml = archive.read(DOCUMENT_PART)
+            self.rendered_xml = self.document_xml
+            logger.info(f"Successfully loaded template document: {template_path}")
+        except Exception as e:
+            logger.error(f"Failed to load template document: {str(e)}")
+            raise
+
+    @staticmethod
+    def _run_text(run) -> str:
+        """Text of a run, as python-docx's Run.text reads it."""
+        parts = []
+        for child in run:
+            tag = etree.QName(child).localname if isinstance(child.tag, str) else None
+            if tag == "t":
+                parts.append(child.text or "")
+            elif tag in ("tab", "ptab"):
+                parts.append("\t")
+            elif tag == "br":
+                parts.append("\n" if child.get(_w("type"), "textWrapping") == "textWrapping" else "")
+            elif tag == "cr":
+                parts.append("\n")
+            elif tag == "noBreakHyphen":
+                parts.append("-")
+        return "".join(parts)
+
+    @staticmethod
+    def _clear_run(run) -> None:
+        """Remove the content of a run, keeping its properties."""
+        for child in list(run):
+            if child.tag != _w("rPr"):
+                run.remove(child)
+
+    @staticmethod
+    def _append_text(run, text: str) -> None:
+        """Add text to a run, with tabs and line breaks as elements (like python-docx)."""
+        pending = []
+
+        def flush():
+            if pending:
+                t = etree.SubElement(run, _w("t"))
+                t.text = "".join(pending)
+                if len(t.text.strip()) < len(t.text):
+                    t.set(XML_SPACE, "preserve")
+                pending.clear()
+
+        for char in text:
+            if char == "\t":
+                flush()
+                etree.SubElement(run, _w("tab"))
+            elif char in "\r\n":
+                flush()
+                etree.SubElement(run, _w("br"))
+            else:
+                pending.append(char)
+        flush()
+
+    @staticmethod
+    def _copied_properties(last_run) -> List:
+        """Formatting of the last run that DocumentFiller carries to the new run."""
+        rPr = last_run.find(_w("rPr"))
+        if rPr is None:
+            return []
+        copied = []
+        for tag in _RPR_ORDER:
+            element = rPr.find(_w(tag))
+            if element is None:
+                continue
+            val = element.get(_w("val"))
+            if tag == "rFonts":
+                ascii_font = element.get(_w("ascii"))
+                if ascii_font is None:
+                    continue
+                new = etree.Element(_w("rFonts"))
+                new.set(_w("ascii"), ascii_font)
+                new.set(_w("hAnsi"), ascii_font)
+            elif tag in ("b", "i"):
+                new = etree.Element(_w(tag))
+                if val is not None and val.lower() in ("0", "false", "off"):
+                    new.set(_w("val"), "0")
+            elif tag == "color":
+                if val is None or val.lower() == "auto":
+                    continue
+                new = etree.Element(_w("color"))
+                new.set(_w("val"), val.upper())
+            elif tag == "u":
+                if val is None:
+                    continue
+                new = etree.Element(_w("u"))
+                new.set(_w("val"), val)
+            else:
+                new = etree.Element(_w(tag))
+                new.set(_w("val"), val)
+            copied.append(new)
+        return copied
+
+    def _replace_placeholders_in_paragraph(self, paragraph, data_dict: Dict) -> None:
+        runs = paragraph.findall(_w("r"))
+        full_text = "".join(self._run_text(run) for run in runs)
+        if "#" not in full_text:
+            return
+
+        try:
+            full_text, modified = substitute_placeholders(full_text, data_dict)
+        except Exception as e:
+            # Same as DocumentFiller: a failing paragraph is left as is, the document is still rendered
+            logger.error(f"Error replacing placeholders in paragraph: {str(e)}")
+            return
+        if not modified:
+            return
+
+        for run in runs:
+            self._clear_run(run)
+
+        if runs and full_text:
+            new_run = etree.SubElement(paragraph, _w("r"))
+            rPr = etree.SubElement(new_run, _w("rPr"))
+            rPr.extend(self._copied_properties(runs[-1]))
+            self._append_text(new_run, full_text)
+
+    def fill_document(self, data_dict: Dict) -> None:
+        """
+        Fill the document with provided data.
+
+        Args:
+            data_dict (Dict): Dictionary containing replacement values
+        """
+        try:
+            root = etree.fromstring(self.document_xml)
+            body = root.find(_w("body"))
+            # Same paragraphs as python-docx: body paragraphs and top-level table cells
+            paragraphs = body.findall(_w("p")) + body.findall(f"{_w('tbl')}/{_w('tr')}/{_w('tc')}/{_w('p')}")
+            for paragraph in paragraphs:
+                self._replace_placeholders_in_paragraph(paragraph, data_dict)
+            self.rendered_xml = etree.tostring(root, encoding="UTF-8", standalone=True)
+            logger.info("Successfully filled document with provided data")
+
+        except Exception as e:
+            logger.error(f"Error filling document: {str(e)}")
+            raise
+
+    def render(self) -> bytes:
+        """
+        Build the filled .docx: the template zip with only word/document.xml replaced.
+
+        Returns:
+            bytes: Content of the filled document
+        """
+        buffer = BytesIO()
+        with zipfile.ZipFile(BytesIO(self.template_bytes)) as template, \
+                zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as output:
+            for info in template.infolist():
+                if info.filename == DOCUMENT_PART:
+                    output.writestr(info, self.rendered_xml)
+                else:
+                    output.writestr(info, template.read(info))
+        return buffer.getvalue()
+
+    def save_document(self, output_path: Path, data_dict: Dict) -> None:
+        """
+        Save the filled document with a dynamic name based on the "21" field.
+
+        Args:
+            output_path (Path): Base path where the document should be saved.
+            data_dict (Dict): Dictionary containing extracted values, including "21" for naming.
+        """
+        try:
+            final_output_path = DocumentFiller.output_path_for(output_path, data_dict.get("21", "UNKNOWN"))
+            write_document_bytes(final_output_path, self.render())
+        except Exception as e:
+            logger.error(f"Error saving document: {str(e)}")
+            raise
@@ -0,0 +1,196 @@
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import linear_kernel
+from src.config import Config
+from src.models.llm_client import chat_completion, count_tokens, truncate_to_tokens, StreamTerminator
+
+logger = logging.getLogger(__name__)
+
+# Examples are separated by a line holding only "---"
+EXAMPLE_SEPARATOR = re.compile(r'(?m)^-{3,}\s*$')
+# Inside an example, the expected output starts at a line "Output:"
+OUTPUT_MARKER = re.compile(r'(?mi)^output\s*:\s*$')
+
+
+class ExampleIndex:
+    """
+    Few-shot examples with a TF-IDF index built once, to pick the examples most
+    similar to a paragraph.
+
+    Examples file format:
+        <example paragraph>
+        Output:
+        <expected answer>
+        ---
+        <next example paragraph>
+        ...
+    """
+
+    def __init__(self, examples_file: Path):
+        """
+        Load and index the examples.
+
+        Args:
+            examples_file (Path): Path to the examples file
+        """
+        self.examples: List[Dict] = []
+        try:
+            content = Path(examples_file).read_text(encoding="utf-8")
+        except Exception as e:
+            logger.warning(f"Could not load examples from {examples_file}: {str(e)}")
+            content = ""
+
+        for block in EXAMPLE_SEPARATOR.split(content):
+            parts = OUTPUT_MARKER.split(block, maxsplit=1)
+            if len(parts) != 2 or not parts[0].strip() or not parts[1].strip():
+                continue
+            rendered = f"Example paragraph:\n{parts[0].strip()}\nExample output:\n{parts[1].strip()}\n\n"
+            self.examples.append({"input": parts[0].strip(), "rendered": rendered, "tokens": count_tokens(rendered)})
+
+        self.vectorizer = None
+        if self.examples:
+            self.vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+            self.matrix = self.vectorizer.fit_transform([example["input"] for example in self.examples])
+        logger.info(f"Indexed {len(self.examples)} few-shot examples from {examples_file}")
+
+    def select(self, text: str, token_budget: int) -> List[Dict]:
+        """
+        Pick the examples most similar to a text that fit in a token budget.
+
+        Args:
+            text (str): Paragraph the prompt is built for
+            token_budget (int): Maximum tokens for all the selected examples
+
+        Returns:
+            List[Dict]: Selected examples, most similar first
+        """
+        if self.vectorizer is None or token_budget <= 0:
+            return []
+        similarities = linear_kernel(self.vectorizer.transform([text]), self.matrix)[0]
+        selected = []
+        for index in similarities.argsort()[::-1]:
+            if similarities[index] <= 0:
+                break  # Unrelated examples only cost tokens
+            example = self.examples[index]
+            if example["tokens"] <= token_budget:
+                selected.append(example)
+                token_budget -= example["tokens"]
+        return selected
+
+
+class PromptBuilder:
+    """
+    Builds the prompt of an extractor as a static prefix (rendered and counted
+    once), similarity-selected few-shot examples and the paragraph, within a
+    token budget, and keeps prompt-token telemetry per extractor.
+    """
+
+    # Telemetry of every builder, by extractor name
+    _telemetry: Dict[str, Dict] = {}
+    _telemetry_lock = threading.Lock()
+
+    def __init__(self, name: str, system_prompt: str, instructions: str, input_label: str,
+                 examples: Optional[ExampleIndex] = None):
+        """
+        Args:
+            name (str): Extractor name, used for telemetry
+            system_prompt (str): System message
+            instructions (str): Static instructions, placed before the examples and the paragraph
+            input_label (str): Label introducing the paragraph (e.g. "Paragraph")
+            examples (Optional[ExampleIndex]): Few-shot examples to select from
+        """
+        self.name = name
+        self.system_prompt = system_prompt
+        self.input_label = input_label
+        self.examples = examples
+        # Static prefix: identical for every call, so it is rendered and counted once
+        self.prefix = instructions.rstrip() + "\n\n"
+        self.prefix_tokens = count_tokens(system_prompt) + count_tokens(self.prefix)
+        with self._telemetry_lock:
+            self._telemetry.setdefault(name, {
+                "calls": 0, "prompt_tokens": 0, "max_prompt_tokens": 0,
+                "example_tokens": 0, "latency_seconds": 0.0
+            })
+
+    def build(self, text: str) -> Tuple[List[Dict[str, str]], int, int]:
+        """
+        Render the chat messages for a paragraph.
+
+        Args:
+            text (str): Paragraph to put in the prompt
+
+        Returns:
+            The messages, their prompt token count and the tokens spent on examples
+        """
+        paragraph = f"{self.input_label}:\n{text}\n"
+        paragraph_tokens = count_tokens(paragraph)
+
+        if paragraph_tokens + self.prefix_tokens > Config.MAX_PROMPT_TOKENS:
+            # The paragraph alone exceeds the budget: keep its beginning, without examples
+            text_budget = Config.MAX_PROMPT_TOKENS - self.prefix_tokens - count_tokens(f"{self.input_label}:\n\n")
+            logger.warning(f"{self.name}: paragraph alone exceeds the prompt budget ({paragraph_tokens} tokens), "
+                           f"truncated to {max(text_budget, 0)} tokens")
+            text = truncate_to_tokens(text, text_budget)
+            paragraph = f"{self.input_label}:\n{text}\n"
+            paragraph_tokens = count_tokens(paragraph)
+
+        # Examples only get what is left of the prompt budget
+        example_budget = min(Config.MAX_EXAMPLE_TOKENS,
+                             Config.MAX_PROMPT_TOKENS - self.prefix_tokens - paragraph_tokens)
+        examples = self.examples.select(text, example_budget) if self.examples else []
+        example_tokens = sum(example["tokens"] for example in examples)
+
+        content = self.prefix + "".join(example["rendered"] for example in examples) + paragraph
+        messages = [{"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": content}]
+        return messages, self.prefix_tokens + example_tokens + paragraph_tokens, example_tokens
+
+    def complete(self, text: str, max_tokens: int, terminator: Optional[StreamTerminator] = None,
+                 deadline: Optional[float] = None) -> str:
+        """
+        Build the prompt for a paragraph and run the completion, recording telemetry.
+
+        Args:
+            text (str): Paragraph to put in the prompt
+            max_tokens (int): Maximum completion tokens
+            terminator (Optional[StreamTerminator]): Early termination of the streamed completion
+            deadline (Optional[float]): time.monotonic() value by which the completion must be done
+
+        Returns:
+            str: The completion text
+        """
+        messages, prompt_tokens, example_tokens = self.build(text)
+        started_at = time.perf_counter()
+        try:
+            return chat_completion(messages, max_tokens=max_tokens, terminator=terminator, deadline=deadline)
+        finally:
+            latency = time.perf_counter() - started_at
+            with self._telemetry_lock:
+                telemetry = self._telemetry[self.name]
+                telemetry["calls"] += 1
+                telemetry["prompt_tokens"] += prompt_tokens
+                telemetry["max_prompt_tokens"] = max(telemetry["max_prompt_tokens"], prompt_tokens)
+                telemetry["example_tokens"] += example_tokens
+                telemetry["latency_seconds"] += latency
+            logger.info(f"{self.name}: {prompt_tokens} prompt tokens ({example_tokens} in examples), {latency:.2f}s")
+
+    @classmethod
+    def telemetry(cls) -> Dict[str, Dict]:
+        """
+        Prompt-token and latency telemetry per extractor.
+
+        Returns:
+            Dict[str, Dict]: Totals, plus average prompt tokens and latency per call
+        """
+        with cls._telemetry_lock:
+            telemetry = {name: dict(values) for name, values in cls._telemetry.items()}
+        for values in telemetry.values():
+            calls = values["calls"] or 1
+            values["avg_prompt_tokens"] = values["prompt_tokens"] / calls
+            values["avg_latency_seconds"] = values["latency_seconds"] / calls
+        return telemetry
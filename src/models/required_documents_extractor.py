@@ -2,6 +2,8 @@ import openai
 import logging
 from typing import Optional
 from src.config import Config
+from src.models.llm_client import BulletListTerminator
+from src.models.prompt_builder import PromptBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -15,41 +17,41 @@ class RequiredDocumentsExtractor:
     def __init__(self):
         """Initialize the DocumentsExtractor with OpenAI API key."""
         openai.api_key = Config.OPENAI_API_KEY  # Ensure this is set in your config
+        self.prompt_builder = PromptBuilder(
+            "required_documents",
+            "You are an assistant for structured document extraction.",
+            "Identifiez et extrayez uniquement les documents requis mentionnés dans le paragraphe ci-dessous. "
+            "Retournez la liste sous forme de points à puces en écrivant les noms des documents de manière simple et concise, "
+            "sans reformulation excessive ni explication. "
+            "Ecrivez les noms des documents en francais."
+            "Indiquez les quantités d’originaux et de copies de manière claire et courte.\n\n"
+            "Format attendu :\n"
+            "- [Nom du document] [Nombre d'originaux et/ou copies]\n"
+            "- [Nom du document] [Nombre d'originaux et/ou copies]\n"
+            "- [Nom du document] [Nombre d'originaux et/ou copies]",
+            "Paragraphe "
+        )
 
-    def extract_documents(self, paragraph: str) -> Optional[str]:
+    def extract_documents(self, paragraph: str, deadline: Optional[float] = None) -> Optional[str]:
         """
         Extracts all required documents mentioned in the given paragraph.
 
         Args:
             paragraph (str): The paragraph containing document references.
+            deadline (Optional[float]): time.monotonic() value by which the LLM call must be done.
 
         Returns:
             Optional[str]: A bullet-point list of extracted document names.
         """
-        prompt = (
-            "Identifiez et extrayez uniquement les documents requis mentionnés dans le paragraphe suivant. "
-            "Retournez la liste sous forme de points à puces en écrivant les noms des documents de manière simple et concise, "
-            "sans reformulation excessive ni explication. "
-            "Ecrivez les noms des documents en francais."
-            "Indiquez les quantités d’originaux et de copies de manière claire et courte.\n\n"
-            f"Paragraphe :\n{paragraph}\n\n"
-            "Format attendu :\n"
-            "- [Nom du document] [Nombre d'originaux et/ou copies]\n"
-            "- [Nom du document] [Nombre d'originaux et/ou copies]\n"
-            "- [Nom du document] [Nombre d'originaux et/ou copies]"
-        )
-
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "system", "content": "You are an assistant for structured document extraction."},
-                          {"role": "user", "content": prompt}],
-                max_tokens=200
+            # Rate limited, streamed call (cancelled once the list is long enough)
+            document_list = self.prompt_builder.complete(
+                paragraph,
+                max_tokens=200,
+                terminator=BulletListTerminator(Config.LLM_MAX_LIST_ITEMS),
+                deadline=deadline
             )
 
-            # Extract and clean the response
-            document_list = response["choices"][0]["message"]["content"].strip()
-
             return document_list
 
         except Exception as e:
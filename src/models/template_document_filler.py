@@ -1,16 +1,59 @@
 import logging
 import re
+from io import BytesIO
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, Tuple
 from docx import Document
 from src.config import Config
+from src.artifact_store import DeltaArtifactStore
 
 logger = logging.getLogger(__name__)
 
 
+def substitute_placeholders(text: str, data_dict: Dict) -> Tuple[str, bool]:
+    """
+    Replace the #key# placeholders of a text (case-insensitive).
+
+    Args:
+        text (str): Text of a paragraph
+        data_dict (Dict): Dictionary containing replacement values
+
+    Returns:
+        Tuple[str, bool]: The new text and whether any placeholder was replaced
+    """
+    modified = False
+    for key, value in data_dict.items():
+        # Literal key and value: keys may contain "(", values backslashes (e.g. C:\new\path)
+        placeholder = re.compile(f'#{re.escape(str(key))}#', flags=re.IGNORECASE)
+        if placeholder.search(text):
+            text = placeholder.sub(lambda match: str(value), text)
+            modified = True
+    return text, modified
+
+
+def write_document_bytes(final_output_path: Path, content: bytes) -> None:
+    """
+    Write a generated document, as a delta when ARTIFACT_STORAGE is "delta".
+
+    Args:
+        final_output_path (Path): Path of the output document
+        content (bytes): Content of the .docx file
+    """
+    if Config.ARTIFACT_STORAGE == "delta" and DeltaArtifactStore().store(final_output_path.name, content):
+        # Drop a full copy left over from the "full" storage mode
+        final_output_path.unlink(missing_ok=True)
+        logger.info(f"Successfully saved filled document as delta: {final_output_path.name}")
+        return
+    final_output_path.write_bytes(content)
+    logger.info(f"Successfully saved filled document to: {final_output_path}")
+
+
 class DocumentFiller:
     """Class for filling Word documents with extracted information."""
 
+    # Raw template bytes, shared by every filler of the same template
+    _template_cache: Dict[Path, bytes] = {}
+
     def __init__(self, template_path: Path):
         """
         Initialize DocumentFiller with template path.
@@ -20,12 +63,29 @@ class DocumentFiller:
         """
         self.template_path = template_path
         try:
-            self.document = Document(template_path)
+            cached = self._template_cache.get(Path(template_path))
+            self.document = Document(BytesIO(cached) if cached is not None else template_path)
             logger.info(f"Successfully loaded template document: {template_path}")
         except Exception as e:
             logger.error(f"Failed to load template document: {str(e)}")
             raise
 
+    @classmethod
+    def preload_templates(cls, template_paths: Iterable[Path]) -> None:
+        """
+        Read template files into memory once, so fillers no longer hit the disk.
+
+        Args:
+            template_paths (Iterable[Path]): Paths of the Word templates to cache
+        """
+        for template_path in template_paths:
+            template_path = Path(template_path)
+            try:
+                cls._template_cache[template_path] = template_path.read_bytes()
+                logger.info(f"Preloaded template document: {template_path}")
+            except Exception as e:
+                logger.warning(f"Could not preload template {template_path}: {str(e)}")
+
     def _replace_placeholders_in_paragraph(self, paragraph, data_dict: Dict) -> None:
         """
         Replace placeholders in a paragraph while preserving formatting.
@@ -35,14 +95,8 @@ class DocumentFiller:
             data_dict (Dict): Dictionary containing replacement values
         """
         try:
-            full_text = "".join(run.text for run in paragraph.runs)
-            modified = False
-
-            for key, value in data_dict.items():
-                placeholder = f'#{key}#'
-                if re.search(placeholder, full_text, flags=re.IGNORECASE):
-                    full_text = re.sub(placeholder, str(value), full_text, flags=re.IGNORECASE)
-                    modified = True
+            full_text, modified = substitute_placeholders(
+                "".join(run.text for run in paragraph.runs), data_dict)
 
             if modified:
                 # Store and apply formatting
@@ -92,6 +146,24 @@ class DocumentFiller:
             logger.error(f"Error filling document: {str(e)}")
             raise
 
+    @staticmethod
+    def output_path_for(output_path: Path, doc_number: str) -> Path:
+        """
+        Build the path of a filled document from its base output path and LC number.
+
+        Args:
+            output_path (Path): Base path of the output document (from Config.OUTPUT_FILES)
+            doc_number (str): Documentary credit number (field "21")
+
+        Returns:
+            Path: e.g. data/output/Bill_of_Lading_<21>.docx
+        """
+        output_path = Path(output_path)
+        doc_number = doc_number.replace("/", "_").replace("\\", "_").strip()
+        if not doc_number:
+            doc_number = "NO_REFERENCE"
+        return output_path.parent / f"{output_path.stem}_{doc_number}{output_path.suffix}"
+
     def save_document(self, output_path: Path, data_dict: Dict) -> None:
         """
         Save the filled document with a dynamic name based on the "21" field.
@@ -101,24 +173,17 @@ class DocumentFiller:
             data_dict (Dict): Dictionary containing extracted values, including "21" for naming.
         """
         try:
-            # Convert output_path to a Path object
-            output_path = Path(output_path)
-
-            doc_number = data_dict.get("21", "UNKNOWN").replace("/", "_").replace("\\", "_").strip()
-            if not doc_number:
-                doc_number = "NO_REFERENCE"
-
-            # Ensure the base output filename from config exists
-            base_filename = output_path.stem  # Get filename without extension
-            file_extension = output_path.suffix  # Get file extension
-
-            # Create new filename by appending "21" value
-            new_filename = f"{base_filename}_{doc_number}{file_extension}"
-            final_output_path = output_path.parent / new_filename  # Save in same directory
+            # Create new filename by appending "21" value, in the same directory
+            final_output_path = self.output_path_for(output_path, data_dict.get("21", "UNKNOWN"))
 
             # Save the document
-            self.document.save(final_output_path)
-            logger.info(f"Successfully saved filled document to: {final_output_path}")
+            if Config.ARTIFACT_STORAGE == "delta":
+                buffer = BytesIO()
+                self.document.save(buffer)
+                write_document_bytes(final_output_path, buffer.getvalue())
+            else:
+                self.document.save(final_output_path)
+                logger.info(f"Successfully saved filled document to: {final_output_path}")
 
         except Exception as e:
             logger.error(f"Error saving document: {str(e)}")
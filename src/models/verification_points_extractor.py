@@ -2,6 +2,8 @@ import openai
 import logging
 from typing import Optional
 from src.config import Config
+from src.models.llm_client import BulletListTerminator
+from src.models.prompt_builder import PromptBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -14,37 +16,37 @@ class VerificationExtraction:
     def __init__(self):
         """Initialize the VerificationExtraction class with the OpenAI API key."""
         openai.api_key = Config.OPENAI_API_KEY  # Ensure this is set in your config
+        self.prompt_builder = PromptBuilder(
+            "verification_points",
+            "You are an assistant for structured document verification.",
+            "Extract the specific points that must be verified in the Bill of Lading (BL) document "
+            "from the Letter of Credit (LC) text below. "
+            "Format the output as a bullet-point list with clear and concise points, "
+            "excluding instructions about misspellings or discrepancies.\n\n"
+            "Provide the output as a simple bullet-point list.",
+            "LC Text"
+        )
 
-    def extract_verification_points(self, paragraph: str) -> Optional[str]:
+    def extract_verification_points(self, paragraph: str, deadline: Optional[float] = None) -> Optional[str]:
         """
         Extracts key verification points from a Letter of Credit (LC) text for Bill of Lading (BL) validation.
 
         Args:
             paragraph (str): The Letter of Credit text to analyze.
+            deadline (Optional[float]): time.monotonic() value by which the LLM call must be done.
 
         Returns:
             Optional[str]: A string containing bullet points with verification points.
         """
-        prompt = (
-            "Extract the specific points that must be verified in the Bill of Lading (BL) document "
-            "from the following Letter of Credit (LC) text. "
-            "Format the output as a bullet-point list with clear and concise points, "
-            "excluding instructions about misspellings or discrepancies.\n\n"
-            f"LC Text:\n{paragraph}\n\n"
-            "Provide the output as a simple bullet-point list."
-        )
-
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "system", "content": "You are an assistant for structured document verification."},
-                          {"role": "user", "content": prompt}],
-                max_tokens=300
+            # Rate limited, streamed call (cancelled once the list is long enough)
+            verification_points = self.prompt_builder.complete(
+                paragraph,
+                max_tokens=300,
+                terminator=BulletListTerminator(Config.LLM_MAX_LIST_ITEMS),
+                deadline=deadline
             )
 
-            # Extract the generated text
-            verification_points = response["choices"][0]["message"]["content"].strip()
-
             return verification_points
 
         except Exception as e:
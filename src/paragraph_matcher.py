@@ -1,18 +1,24 @@
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from typing import List, Dict, Union
+from src.config import Config
 
 class ParagraphMatcher:
     def __init__(self):
         self.vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+        # Stateless alternative: no vocabulary to fit on every call
+        self.hashing_vectorizer = HashingVectorizer(ngram_range=(1, 2), alternate_sign=False)
 
     def find_similar_paragraphs(self, input_paragraphs: List[str], reference_paragraphs: Union[str, List[str]]) -> List[Dict]:
         if isinstance(reference_paragraphs, str):
             reference_paragraphs = [reference_paragraphs]
 
         all_texts = input_paragraphs + reference_paragraphs
-        tfidf_matrix = self.vectorizer.fit_transform(all_texts)
+        if Config.MATCHER_MODE == "hashed":
+            tfidf_matrix = self.hashing_vectorizer.transform(all_texts)
+        else:
+            tfidf_matrix = self.vectorizer.fit_transform(all_texts)
 
         input_vectors = tfidf_matrix[:len(input_paragraphs)]
         reference_vectors = tfidf_matrix[len(input_paragraphs):]
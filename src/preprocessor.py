@@ -10,7 +10,9 @@ class TextPreprocessor:
         self.nlp = spacy.load(Config.SPACY_MODEL)
 
     def preprocess_with_spacy(self, text: str) -> List[str]:
-        doc = self.nlp(text)
+        # Only the token texts are used: tokenize without running the tagger,
+        # parser and NER (same tokens, a fraction of the memory, no max_length cap)
+        doc = self.nlp.tokenizer(text)
         tokens = self._tokenize_with_custom_logic(doc)
         return self._clean_tokens(tokens)
 
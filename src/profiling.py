@@ -0,0 +1,57 @@
+import cProfile
+import hmac
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def profiling_requested(token: Optional[str]) -> bool:
+    """
+    Check whether a request asked for profiling with the admin token.
+
+    Args:
+        token (Optional[str]): Token sent with the request (header or query flag)
+
+    Returns:
+        bool: True if profiling is enabled and the token matches
+    """
+    if not Config.PROFILE_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token, Config.PROFILE_TOKEN)
+
+
+@contextmanager
+def profile_request(label: str) -> Iterator[Path]:
+    """
+    Profile the enclosed block with cProfile and dump the stats to Config.PROFILE_FOLDER.
+
+    The artifact is a pstats file, readable with `python -m pstats` or
+    converted to a flamegraph with tools such as flameprof or snakeviz.
+
+    Args:
+        label (str): Short name included in the artifact file name
+
+    Yields:
+        Path: Path where the profile will be written when the block exits
+    """
+    profile_folder = Path(Config.PROFILE_FOLDER)
+    profile_folder.mkdir(parents=True, exist_ok=True)
+    profile_path = profile_folder / f"{time.strftime('%Y%m%d-%H%M%S')}_{label}_{uuid.uuid4().hex[:8]}.pstats"
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profile_path
+    finally:
+        profiler.disable()
+        try:
+            profiler.dump_stats(profile_path)
+            logger.info(f"Wrote request profile to {profile_path}")
+        except Exception as e:
+            logger.error(f"Error writing request profile: {str(e)}")
@@ -0,0 +1,164 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from src.config import Config
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+
+    Not thread-safe on its own: callers serialize access with their own lock.
+    """
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        """
+        Initialize the bucket, full.
+
+        Args:
+            per_minute (float): Tokens added per minute
+            capacity (float): Maximum number of tokens (defaults to one minute worth)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Refill the bucket and compute how long until `amount` tokens are available.
+
+        Args:
+            amount (float): Number of tokens needed (capped to the capacity)
+
+        Returns:
+            float: 0 if the tokens are available now, else the seconds to wait
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Take tokens, after wait_time() returned 0."""
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the LLM rate limit could not be satisfied in time."""
+
+
+class LLMRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits shared by all LLM extractors
+    of a process.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, timeout: float):
+        """
+        Args:
+            requests_per_minute (float): Maximum LLM calls per minute
+            tokens_per_minute (float): Maximum prompt + completion tokens per minute
+            timeout (float): Maximum seconds a call waits for capacity
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.timeout = timeout
+        self.lock = threading.Lock()
+
+    def acquire(self, estimated_tokens: int, timeout: Optional[float] = None) -> None:
+        """
+        Block until one request and the estimated tokens can be spent.
+
+        Args:
+            estimated_tokens (int): Prompt tokens plus max completion tokens
+            timeout (Optional[float]): Shorter wait than the limiter's timeout, e.g. the
+                time left before the caller's deadline
+
+        Raises:
+            RateLimitExceeded: If the capacity is not available within the timeout
+        """
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        deadline = time.monotonic() + timeout
+        while True:
+            # Take both budgets together so a caller never holds one while waiting for the other
+            with self.lock:
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+                if wait == 0:
+                    self.requests.consume(1)
+                    self.tokens.consume(estimated_tokens)
+                    return
+
+            if time.monotonic() + wait > deadline:
+                raise RateLimitExceeded(f"LLM rate limit: no capacity within {timeout:.1f}s")
+            time.sleep(wait)
+
+
+class AdmissionRejected(Exception):
+    """Raised when the admission queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Admission queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounded admission queue in front of the processing pipeline: at most
+    `max_concurrent` pipelines run at once and at most `max_queued` requests
+    wait for a slot; any further request is rejected immediately.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        """
+        Args:
+            max_concurrent (int): Pipelines running at the same time
+            max_queued (int): Requests allowed to wait for a slot
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.slots = threading.Semaphore(max_concurrent)
+        self.lock = threading.Lock()
+        self.pending = 0
+        # Moving average of the pipeline duration, used for Retry-After
+        self.average_duration = 10.0
+
+    def retry_after(self) -> int:
+        """Estimate the seconds until a slot frees up for a new request."""
+        waves = self.pending / self.max_concurrent
+        return max(1, math.ceil(waves * self.average_duration))
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """
+        Run the enclosed block once a pipeline slot is available.
+
+        Raises:
+            AdmissionRejected: If the queue is already full
+        """
+        with self.lock:
+            if self.pending >= self.max_concurrent + self.max_queued:
+                raise AdmissionRejected(self.retry_after())
+            self.pending += 1
+
+        try:
+            with self.slots:
+                started_at = time.monotonic()
+                yield
+                duration = time.monotonic() - started_at
+                with self.lock:
+                    self.average_duration = 0.8 * self.average_duration + 0.2 * duration
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+
+# Shared by every extractor and request of the process
+llm_rate_limiter = LLMRateLimiter(
+    Config.LLM_REQUESTS_PER_MINUTE,
+    Config.LLM_TOKENS_PER_MINUTE,
+    Config.LLM_RATE_LIMIT_TIMEOUT
+)
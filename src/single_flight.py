@@ -0,0 +1,82 @@
+import hashlib
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Tuple
+from filelock import FileLock
+from src.config import Config
+
+
+class _Call:
+    """An in-flight computation other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing the same key: the first caller runs the
+    computation, the others wait for it and get the same result (or exception).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key (str): Identity of the computation
+            fn (Callable[[], Any]): The computation
+
+        Returns:
+            Tuple[Any, bool]: The result, and whether it was shared from another caller
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+
+@contextmanager
+def process_lock(key: str) -> Iterator[None]:
+    """
+    Serialize the same computation across worker processes with a lock file.
+
+    Keys are hashed onto Config.LOCK_SLOTS lock files, spread over 256 sub-folders
+    and never deleted (removing a lock file while another process waits on it
+    would let two processes hold the lock). The slot space is large enough that
+    two different keys in flight rarely share a slot; if they do, one waits for
+    the other.
+
+    Args:
+        key (str): Identity of the computation
+    """
+    slot = int(hashlib.sha256(key.encode("utf-8")).hexdigest(), 16) % Config.LOCK_SLOTS
+    lock_folder = Path(Config.LOCK_FOLDER) / f"{slot % 256:02x}"
+    lock_folder.mkdir(parents=True, exist_ok=True)
+    with FileLock(lock_folder / f"slot-{slot:05d}.lock"):
+        yield
@@ -0,0 +1,56 @@
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple, Union
+
+# Size of the pieces read from the source files
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkBuffer:
+    """Write-only, non-seekable file object collecting what zipfile writes."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_zip(entries: Iterable[Tuple[str, Union[Path, bytes]]]) -> Iterator[bytes]:
+    """
+    Build a zip archive incrementally, yielding its bytes as they are produced.
+
+    No temporary archive is written and at most one chunk of a source file is
+    held in memory, whatever the size of the documents. The members are stored
+    uncompressed since .docx files are already compressed.
+
+    Args:
+        entries (Iterable[Tuple[str, Union[Path, bytes]]]): Archive name and
+            content (file path or in-memory bytes) of each member
+
+    Yields:
+        bytes: The next piece of the archive
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, content in entries:
+            with archive.open(name, "w", force_zip64=True) as member:
+                if isinstance(content, bytes):
+                    member.write(content)
+                else:
+                    with open(content, "rb") as source:
+                        while chunk := source.read(CHUNK_SIZE):
+                            member.write(chunk)
+                            yield buffer.drain()
+            yield buffer.drain()
+    # Central directory
+    yield buffer.drain()
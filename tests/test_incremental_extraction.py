@@ -0,0 +1,76 @@
+"""
+Tests of the incremental re-extraction of re-uploaded and amended LCs.
+
+Run from the project root:
+    python -m unittest discover -s tests -t .
+"""
+import tempfile
+import unittest
+
+from src.lc_state_store import LCStateStore
+from src.main import DocumentProcessor, LCAnalysisContext
+
+
+def field(value: str) -> dict:
+    return {"description": "", "value": value}
+
+
+FULL_LC = {code: field(value) for code, value in {
+    "20": "REF1", "21": "LC123", "32B": "USD 1000", "50": "ACME", "59": "GLOBAL EXPORTS",
+    "46A": "FULL SET OF BILLS OF LADING", "47A": "ALL DOCUMENTS MUST SHOW LC NUMBER",
+}.items()}
+
+
+class ProcessExtractionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        # No models needed: only the state store is used, the extractions are faked
+        self.processor = DocumentProcessor.__new__(DocumentProcessor)
+        self.processor.state_store = LCStateStore(self.folder.name)
+        self.processor._run_extraction = self.fake_extraction
+        self.extracted = []
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def fake_extraction(self, name: str, context: LCAnalysisContext):
+        self.extracted.append(name)
+        source = context.lc_info.get(DocumentProcessor.EXTRACTION_SOURCES[name])
+        return f"{name} of {source['value']}" if source else None
+
+    def upload(self, lc_info: dict) -> LCAnalysisContext:
+        self.extracted = []
+        return self.processor.process_extractions(LCAnalysisContext(dict(lc_info), matcher=None))
+
+    def test_unchanged_re_upload_reuses_every_result(self):
+        self.upload(FULL_LC)
+        context = self.upload(FULL_LC)
+        self.assertEqual(self.extracted, [])
+        self.assertEqual(context.extractions["Verification Points"], f"Verification Points of {FULL_LC['47A']['value']}")
+
+    def test_full_re_upload_drops_removed_fields_and_their_results(self):
+        self.upload(FULL_LC)
+        corrected = {code: value for code, value in FULL_LC.items() if code != "47A"}
+        context = self.upload(corrected)
+        self.assertNotIn("47A", context.lc_info)
+        self.assertIsNone(context.extractions["Verification Points"])
+        self.assertEqual(self.extracted, ["Verification Points"])
+        self.assertNotIn("47A", self.processor.state_store.load("LC123")["lc_info"])
+
+    def test_amendment_is_merged_over_the_stored_lc(self):
+        self.upload(FULL_LC)
+        context = self.upload({"20": field("AMD1"), "21": field("LC123"), "26E": field("1"),
+                               "47A": field("ALL DOCUMENTS IN ENGLISH")})
+        self.assertEqual(context.lc_info["46A"], FULL_LC["46A"])
+        self.assertEqual(self.extracted, ["Verification Points"])
+        self.assertEqual(context.extractions["Verification Points"], "Verification Points of ALL DOCUMENTS IN ENGLISH")
+
+    def test_partial_upload_is_an_amendment(self):
+        self.assertTrue(LCStateStore.is_amendment({"21": field("LC123"), "46A": field("X")}))
+        self.assertFalse(LCStateStore.is_amendment(FULL_LC))
+        self.assertTrue(LCStateStore.is_amendment({**FULL_LC, "30": field("240301")}))
+
+
+if __name__ == "__main__":
+    unittest.main()
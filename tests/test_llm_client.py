@@ -0,0 +1,118 @@
+"""
+Tests of the early termination of LLM completions, against a local streaming
+mock of the chat completion API (no network, no API key needed).
+
+Run from the project root:
+    python -m unittest discover -s tests -t .
+"""
+import unittest
+from unittest import mock
+
+from src.config import Config
+from src.models import llm_client
+from src.models.llm_client import BulletListTerminator, JSONObjectTerminator, chat_completion, consume_stream
+
+
+class MockStream:
+    """Streamed completion in the OpenAI chunk format, recording how far it was read."""
+
+    def __init__(self, text: str, chunk_size: int = 1):
+        self.pieces = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.pieces:
+            self.read += 1
+            yield {"choices": [{"delta": {"content": piece}}]}
+
+    def close(self):
+        self.closed = True
+
+
+def mock_create(text: str, chunk_size: int = 1):
+    """Build a mock of openai.ChatCompletion.create returning `text`, streamed or not."""
+    streams = []
+
+    def create(model, messages, max_tokens, stream=False, request_timeout=None):
+        if not stream:
+            return {"choices": [{"message": {"content": text}}]}
+        streams.append(MockStream(text, chunk_size))
+        return streams[-1]
+
+    create.streams = streams
+    return create
+
+
+class JSONObjectTerminatorTest(unittest.TestCase):
+
+    def test_stops_when_the_object_closes(self):
+        stream = MockStream('Here it is: {"a": "1", "b": {"c": "2"}} and some trailing explanation')
+        self.assertEqual(consume_stream(stream, JSONObjectTerminator()), '{"a": "1", "b": {"c": "2"}}')
+        self.assertLess(stream.read, len(stream.pieces))
+        self.assertTrue(stream.closed)
+
+    def test_ignores_braces_in_strings(self):
+        stream = MockStream('{"a": "x}y{\\"z"} trailing', chunk_size=3)
+        self.assertEqual(consume_stream(stream, JSONObjectTerminator()), '{"a": "x}y{\\"z"}')
+
+    def test_incomplete_object_returns_the_text(self):
+        self.assertEqual(consume_stream(MockStream('{"a": "1"'), JSONObjectTerminator()), '{"a": "1"')
+
+
+class BulletListTerminatorTest(unittest.TestCase):
+
+    def assert_cut(self, text: str, expected: str, max_items: int = 2, chunk_size: int = 1):
+        stream = MockStream(text, chunk_size)
+        self.assertEqual(consume_stream(stream, BulletListTerminator(max_items)), expected)
+        self.assertTrue(stream.closed)
+
+    def test_cuts_at_max_items(self):
+        self.assert_cut("- a\n- b\n- c\n- d\n", "- a\n- b")
+
+    def test_counts_a_short_last_item_without_newline(self):
+        self.assert_cut("- a\n- b\n- c", "- a\n- b")
+        self.assert_cut("1. a\n2. b\n10. c", "1. a\n2. b")
+
+    def test_cuts_whatever_the_chunking(self):
+        for chunk_size in (1, 2, 5, 100):
+            self.assert_cut("- a\n- b\n- c", "- a\n- b", chunk_size=chunk_size)
+
+    def test_stops_reading_once_the_limit_is_passed(self):
+        stream = MockStream("- a\n- b\n- c\n" + "- more\n" * 50)
+        consume_stream(stream, BulletListTerminator(2))
+        self.assertLess(stream.read, len(stream.pieces))
+
+    def test_keeps_lists_under_the_limit_and_non_item_lines(self):
+        self.assert_cut("Documents:\n- a\n  continued\n- b", "Documents:\n- a\n  continued\n- b")
+        self.assert_cut("- a", "- a")
+
+
+class ChatCompletionTest(unittest.TestCase):
+
+    def complete(self, text: str, streaming: bool, terminator) -> str:
+        create = mock_create(text)
+        with mock.patch.object(llm_client.openai.ChatCompletion, "create", create), \
+                mock.patch.object(Config, "LLM_STREAMING", streaming):
+            result = chat_completion([{"role": "user", "content": "List"}], max_tokens=50, terminator=terminator)
+        # Only completions with a terminator are streamed
+        self.assertEqual(len(create.streams), 1 if streaming and terminator is not None else 0)
+        return result
+
+    def test_list_limit_applies_streamed_or_not(self):
+        for streaming in (True, False):
+            with self.subTest(streaming=streaming):
+                self.assertEqual(self.complete("- a\n- b\n- c", streaming, BulletListTerminator(2)), "- a\n- b")
+
+    def test_json_object_cut_applies_streamed_or_not(self):
+        for streaming in (True, False):
+            with self.subTest(streaming=streaming):
+                self.assertEqual(self.complete('```json\n{"a": "1"}\n```', streaming, JSONObjectTerminator()),
+                                 '{"a": "1"}')
+
+    def test_without_terminator_the_full_text_is_returned(self):
+        self.assertEqual(self.complete("  - a\n- b\n- c  ", True, None), "- a\n- b\n- c")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Tests of the queued JSON-lines logging.
+
+Run from the project root:
+    python -m unittest discover -s tests -t .
+"""
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.logging_setup import configure_logging, request_id_var, shutdown_logging
+
+
+class JSONLinesTest(unittest.TestCase):
+
+    def test_traceback_is_kept_apart_from_the_message(self):
+        with tempfile.TemporaryDirectory() as folder:
+            log_file = Path(folder) / "test.log"
+            configure_logging(log_file, console=False)
+            token = request_id_var.set("req-1")
+            try:
+                try:
+                    1 / 0
+                except ZeroDivisionError:
+                    logging.getLogger("test").exception("Failed on %s", "LC123")
+                logging.getLogger("test").info("Done")
+            finally:
+                request_id_var.reset(token)
+                shutdown_logging()
+                logging.getLogger().handlers.clear()
+
+            failed, done = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+
+        self.assertEqual(failed["message"], "Failed on LC123")
+        self.assertEqual(failed["request_id"], "req-1")
+        self.assertIn("ZeroDivisionError", failed["exception"])
+        self.assertEqual(done["message"], "Done")
+        self.assertNotIn("exception", done)
+
+
+if __name__ == "__main__":
+    unittest.main()